@@ -1,19 +1,44 @@
 from __future__ import annotations
-import tkinter as tk
-from tkinter import scrolledtext
-from tkinter import ttk
-from googlesearch import search
-import requests
-from bs4 import BeautifulSoup
-from bs4.element import Tag
+import time
+# Referência para medir o início (PROCURA_MEDIR_INICIO=1)
+_INICIO_PROCESSO = time.perf_counter()
+try:
+    import tkinter as tk
+    from tkinter import scrolledtext, ttk, filedialog, messagebox
+except ImportError:  # Linux sem Tk: só o modo linha de comando (--help)
+    tk = scrolledtext = ttk = filedialog = messagebox = None
+import abc
+import argparse
+import bisect
+import csv
+import difflib
+import gzip
+import io
 import json
+import multiprocessing
+import os
+import queue
 import re
+import signal
+import socket
+import sqlite3
+import sys
 import threading
+import unicodedata
+from collections import OrderedDict, deque
 import webbrowser
-from tkinter import filedialog, messagebox
-from openpyxl import Workbook
-from urllib.parse import urlparse
-from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urlparse, urlunparse, urljoin, unquote, parse_qsl, urlencode
+from html import unescape
+from typing import Optional, List, Dict, Any, Iterable, Callable, Tuple, TYPE_CHECKING
+
+# requests, bs4, openpyxl e googlesearch são importados no primeiro uso
+# (dentro das funções), para a janela abrir sem esperar por eles
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+    from bs4.element import Tag
+    from urllib.robotparser import RobotFileParser
 
 # -------------------------------------------
 # Listas e cache
@@ -29,13 +54,108 @@ UFS = [
     ("SP", "São Paulo"), ("SE", "Sergipe"), ("TO", "Tocantins")
 ]
 MUNICIPIOS_CACHE: Dict[str, List[str]] = {}
+# Índice de municípios (JSON gzip em DIR_DADOS ou embutido no executável),
+# renovado com uma única requisição ao IBGE quando tiver mais de MUNICIPIOS_TTL
+ARQUIVO_MUNICIPIOS = "municipios.json.gz"
+MUNICIPIOS_TTL = 30 * 24 * 3600
+URL_MUNICIPIOS = "https://servicodados.ibge.gov.br/api/v1/localidades/municipios?view=nivelado"
+# Máximo de sugestões no combo de cidade enquanto se digita
+SUGESTOES_CIDADE = 50
 SEARCH_RESULTS: List[Dict[str, Any]] = []
 
-# Flags/globais para barra de progresso
-CANCELAR = False
+# Flags/globais para barra de progresso (CANCELAMENTO = token da busca em andamento)
+CANCELAMENTO: Optional["Cancelamento"] = None
 TOTAL_PASSOS = 0
 PASSOS_CONCLUIDOS = 0
 
+# Progresso compartilhado: as threads só atualizam contadores (sob lock) e a
+# UI lê tudo a cada INTERVALO_PROGRESSO_MS, junto com os resultados pendentes
+INTERVALO_PROGRESSO_MS = 100
+PAGINAS_BAIXADAS = 0
+INICIO_BUSCA = 0.0
+DOMINIO_ATUAL = ""
+_PROGRESSO_LOCK = threading.Lock()
+_RESULTADOS_PENDENTES: "deque[Dict[str, Any]]" = deque()
+_POLL_PROGRESSO: Optional[str] = None
+
+# Limites de downloads simultâneos (global e por host)
+MAX_DOWNLOADS_SIMULTANEOS = 8
+MAX_DOWNLOADS_POR_HOST = 2
+
+# Processos para parse/extração (0 = extrai nas próprias threads de download)
+PROCESSOS_EXTRACAO = int(os.environ.get("PROCURA_PROCESSOS", "0") or 0)
+
+# Crawler de páginas de contato: níveis de links seguidos e páginas extras por site
+CRAWLER_ATIVO = True
+CRAWLER_PROFUNDIDADE = 1
+CRAWLER_MAX_PAGINAS = 3
+# robots.txt / sitemap.xml: descoberta de páginas de contato antes de seguir links
+CRAWLER_USAR_SITEMAP = True
+CRAWLER_RESPEITAR_ROBOTS = True
+SITEMAP_MAX_ARQUIVOS = 3
+# Hosts lembrados em memória (robots/sitemap e limite por host); os menos
+# usados são descartados, para varreduras longas não crescerem sem fim
+MAX_HOSTS_MEMORIA = 5000
+# (peso, palavra) procurada no caminho da URL ou no texto do link, sem acentos
+PALAVRAS_CONTATO = (
+    (3, "contato"), (3, "fale-conosco"), (3, "faleconosco"), (3, "fale conosco"), (3, "contact"),
+    (2, "atendimento"), (2, "onde-estamos"), (2, "localizacao"), (2, "endereco"),
+    (1, "sobre"), (1, "quem-somos"), (1, "quem somos"), (1, "about"), (1, "empresa"),
+)
+
+# Sites por busca e máximo de sites em andamento entre busca e extração
+NUM_SITES = 10
+FILA_PIPELINE = 16
+
+# Varredura de UFs inteiras: cidades buscadas ao mesmo tempo e intervalo
+# mínimo (s) entre o início de duas buscas, para não sobrecarregar o buscador
+VARREDURA_CIDADES_SIMULTANEAS = 2
+VARREDURA_INTERVALO_S = 2.0
+# Resultados gravados em disco durante a busca: intervalo (s) entre fsyncs
+SINK_FSYNC_S = 2.0
+# Base de resultados (DIR_DADOS/resultados.sqlite3): todo site extraído fica
+# registrado, com deduplicação entre execuções
+BASE_RESULTADOS_ATIVA = True
+# Pula (sem baixar) sites já gravados na base nos últimos N dias (None = não pula)
+BASE_PULAR_VISTOS_DIAS: Optional[float] = None
+# Fila de trabalho (--fila): arrendamento (s), tentativas por tarefa, espera
+# antes de refazer uma tarefa que falhou (dobra a cada tentativa) e espera
+# entre consultas quando só restam tarefas de outros trabalhadores
+FILA_LEASE_S = 300
+FILA_MAX_TENTATIVAS = 3
+FILA_REPETIR_S = 30.0
+FILA_ESPERA_S = 5.0
+
+# Cliente HTTP compartilhado (timeout em segundos e novas tentativas); a
+# conexão tem prazo próprio, curto, para hosts que não respondem
+HTTP_TIMEOUT = 10
+HTTP_TIMEOUT_CONEXAO = 4
+HTTP_TENTATIVAS = 2
+
+# Download de páginas: limite de bytes lidos e tipos aceitos
+MAX_BYTES_PAGINA = 2 * 1024 * 1024
+TIPOS_HTML = ("text/html", "application/xhtml+xml", "text/plain")
+TIPOS_SITEMAP = ("application/xml", "text/xml", "application/gzip", "application/x-gzip",
+                 "application/octet-stream", "text/plain")
+
+# Cache de páginas em disco (SQLite): validade, tamanho máximo e local
+CACHE_PAGINAS_ATIVO = True
+CACHE_PAGINAS_TTL = 24 * 3600
+CACHE_PAGINAS_MAX_BYTES = 200 * 1024 * 1024
+# Cache de resultados do buscador (memória + disco opcional)
+CACHE_BUSCAS_ATIVO = True
+CACHE_BUSCAS_DISCO = True
+CACHE_BUSCAS_TTL = 24 * 3600
+CACHE_BUSCAS_MAX = 500
+# Parser HTML: "auto" (selectolax > lxml > html.parser), ou um deles explicitamente
+PARSER_HTML = os.environ.get("PROCURA_PARSER", "auto")
+DIR_DADOS = os.environ.get("PROCURA_DIR") or os.path.join(os.path.expanduser("~"), ".procura")
+# Arquivo do cache de buscas; pode ficar numa pasta compartilhada pela equipe
+# sem levar junto o resto de DIR_DADOS (padrão: DIR_DADOS/cache_buscas.sqlite3)
+ARQUIVO_CACHE_BUSCAS = os.environ.get("PROCURA_CACHE_BUSCAS", "")
+# Mede o tempo até a janela ser pintada, imprime e fecha (benchmark de início)
+MEDIR_INICIO = bool(os.environ.get("PROCURA_MEDIR_INICIO"))
+
 # Widgets globais (opcionais para satisfazer analisadores estáticos/Pylance)
 root: Optional[tk.Tk] = None
 estado_combo: Optional[ttk.Combobox] = None
@@ -47,6 +167,13 @@ btn_planilha: Optional[tk.Button] = None
 btn_cancelar: Optional[tk.Button] = None
 status_label: Optional[ttk.Label] = None
 progress: Optional[ttk.Progressbar] = None
+pagina_label: Optional[ttk.Label] = None
+btn_pagina_anterior: Optional[tk.Button] = None
+btn_pagina_proxima: Optional[tk.Button] = None
+
+# Paginação do painel de resultados
+RESULTADOS_POR_PAGINA = 200
+PAGINA_ATUAL = 0
 
 # -------------------------------------------
 # Utilitários
@@ -64,32 +191,258 @@ def _uniq(seq):
     return list(dict.fromkeys([s for s in seq if s]))
 
 
-def _iter_hrefs(soup: BeautifulSoup):
+def _fechar_resposta(resp):
+    """Fecha uma resposta HTTP derrubando o socket (acorda leituras bloqueadas em outra thread)."""
+    raw = getattr(resp, "raw", None)
+    # http.client solta conn.sock após os cabeçalhos; o socket fica no arquivo do
+    # corpo. Caminho interno: urllib3 1.26/2.x (HTTPResponse._fp é o
+    # http.client.HTTPResponse) e CPython 3 (fp = BufferedReader sobre
+    # socket.SocketIO, que guarda _sock). Se mudar, tenta o socket da conexão
+    # (connection no urllib3 2.x, _connection no 1.26) e, por fim, só fecha.
+    arquivo = getattr(getattr(raw, "_fp", None), "fp", None)
+    sock = getattr(getattr(arquivo, "raw", None), "_sock", None)
+    for atributo in ("connection", "_connection"):
+        if sock is None:
+            sock = getattr(getattr(raw, atributo, None), "sock", None)
+    if not isinstance(sock, socket.socket):
+        sock = None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+    try:
+        resp.close()
+    except Exception:
+        pass
+
+
+class Cancelamento:
+    """
+    Token de cancelamento de uma busca, repassado às etapas de busca,
+    download, crawler e extração. cancelar() marca o token, derruba as
+    respostas HTTP ainda abertas e dispara os callbacks registrados
+    (ex.: acordar filas, fechar o pool de processos).
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+        self._lock = threading.Lock()
+        self._abertos: set = set()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """Dorme até `timeout` segundos; retorna True se cancelado no meio."""
+        return self._evento.wait(timeout)
+
+    def ao_cancelar(self, fn: Callable[[], None]):
+        with self._lock:
+            if not self._evento.is_set():
+                self._callbacks.append(fn)
+                return
+        fn()
+
+    def registrar(self, resp):
+        """Acompanha uma resposta aberta; se já cancelado, fecha na hora."""
+        with self._lock:
+            if not self._evento.is_set():
+                self._abertos.add(resp)
+                return
+        _fechar_resposta(resp)
+
+    def liberar(self, resp):
+        with self._lock:
+            self._abertos.discard(resp)
+
+    def cancelar(self):
+        with self._lock:
+            if self._evento.is_set():
+                return
+            self._evento.set()
+            abertos, self._abertos = list(self._abertos), set()
+            callbacks, self._callbacks = self._callbacks, []
+        for resp in abertos:
+            _fechar_resposta(resp)
+        for fn in callbacks:
+            try:
+                fn()
+            except Exception:
+                pass
+
+
+# Token que nunca é cancelado (chamadas fora de uma busca)
+SEM_CANCELAMENTO = Cancelamento()
+
+
+def _href_valores(node: Tag):
     """
-    Itera com segurança por todos os hrefs:
+    Hrefs de um <a> com segurança:
     lida com href sendo str OU lista (AttributeValueList).
     Evita erros de tipagem do Pylance/BS4.
     """
-    for node in soup.find_all('a'):
-        if not isinstance(node, Tag):
-            continue
-        href_val = node.get('href', None)
-        if isinstance(href_val, list):
-            for hv in href_val:
-                if isinstance(hv, str):
-                    yield hv
-        elif isinstance(href_val, str):
-            yield href_val
+    href_val = node.get('href', None)
+    if isinstance(href_val, list):
+        for hv in href_val:
+            if isinstance(hv, str):
+                yield hv
+    elif isinstance(href_val, str):
+        yield href_val
+
+
+def _tipos_texto(soup: BeautifulSoup):
+    """Tipos de string que soup.get_text() consideraria (exclui script/style/comentários)."""
+    from bs4.element import Tag, NavigableString, CData
+    tipos = getattr(soup, "interesting_string_types", None)
+    if tipos is None:
+        tipos = getattr(Tag, "MAIN_CONTENT_STRING_TYPES", None) or (NavigableString, CData)
+    return tipos if isinstance(tipos, (tuple, set, frozenset)) else (tipos,)
+
+
+def varrer_pagina(soup: BeautifulSoup) -> Dict[str, Any]:
+    """
+    Percorre a árvore UMA única vez e devolve as visões usadas pelos extratores:
+      - texto: equivalente a soup.get_text(separator=' ', strip=True)
+      - hrefs: todos os hrefs de <a>, na ordem do documento
+      - ancoras: (href, texto do link) de cada href, para achar páginas de contato
+      - mailto / tel / http: hrefs já classificados (tel inclui links de WhatsApp;
+        tel/http guardam também a versão em minúsculas)
+      - jsonld: conteúdo bruto dos blocos <script type="application/ld+json">
+    """
+    from bs4.element import Tag
+    tipos = _tipos_texto(soup)
+    partes: List[str] = []
+    ancoras: List[Tuple[str, str]] = []
+    jsonld: List[str] = []
+    for node in soup.descendants:
+        if isinstance(node, Tag):
+            if node.name == 'a':
+                valores = list(_href_valores(node))
+                if valores:
+                    rotulo = node.get_text(separator=' ', strip=True)
+                    ancoras.extend((h, rotulo) for h in valores)
+            elif node.name == 'script' and node.get('type') == 'application/ld+json':
+                raw = node.string if node.string is not None else node.get_text()
+                jsonld.append(raw or '')
+        elif type(node) in tipos:
+            t = node.strip()
+            if t:
+                partes.append(t)
+    return _montar_visoes(partes, ancoras, jsonld)
+
+
+def _montar_visoes(partes: List[str], ancoras: List[Tuple[str, str]], jsonld: List[str]) -> Dict[str, Any]:
+    hrefs = [h for h, _ in ancoras]
+    mailto, tel, http = [], [], []
+    for h in hrefs:
+        low = h.lower()
+        if low.startswith('mailto:'):
+            mailto.append(h)
+        if low.startswith('tel:') or 'wa.me/' in low or 'whatsapp.com/send' in low:
+            tel.append((h, low))
+        if low.startswith('http'):
+            http.append((h, low))
+    return {
+        "texto": " ".join(partes),
+        "hrefs": hrefs,
+        "ancoras": ancoras,
+        "mailto": mailto,
+        "tel": tel,
+        "http": http,
+        "jsonld": jsonld,
+    }
+
+# -------------------------------------------
+# Backends de parser HTML
+# -------------------------------------------
+
+# Mesmo critério do get_text() do BeautifulSoup: textos dentro destas tags não contam
+_TAGS_SEM_TEXTO = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+
+def _varrer_selectolax(html: str) -> Dict[str, Any]:
+    """Equivalente a varrer_pagina() usando o parser Lexbor (selectolax), em C."""
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(html)
+    partes: List[str] = []
+    ancoras: List[Tuple[str, str]] = []
+    jsonld: List[str] = []
+    raiz = tree.root
+    if raiz is None:
+        return _montar_visoes(partes, ancoras, jsonld)
+    for node in raiz.traverse(include_text=True):
+        tag = node.tag
+        if tag == '-text':
+            pai = node.parent
+            if pai is not None and pai.tag in _TAGS_SEM_TEXTO:
+                continue
+            t = (node.text_content or '').strip()
+            if t:
+                partes.append(t)
+        elif tag == 'a':
+            attrs = node.attributes
+            if 'href' in attrs:
+                ancoras.append((attrs['href'] or '', node.text(deep=True, separator=' ', strip=True)))
+        elif tag == 'script' and node.attributes.get('type') == 'application/ld+json':
+            jsonld.append(node.text(deep=True) or '')
+    return _montar_visoes(partes, ancoras, jsonld)
+
+
+def _varrer_bs4(features: str):
+    def _varrer(html: str) -> Dict[str, Any]:
+        from bs4 import BeautifulSoup
+        return varrer_pagina(BeautifulSoup(html, features))
+    return _varrer
+
+
+def _backend_disponivel(nome: str) -> bool:
+    try:
+        if nome == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif nome == "lxml":
+            import lxml  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+# Ordem de preferência quando PARSER_HTML = "auto" (mais rápido primeiro)
+PARSERS_HTML = {
+    "selectolax": _varrer_selectolax,
+    "lxml": _varrer_bs4("lxml"),
+    "html.parser": _varrer_bs4("html.parser"),
+}
+
+_PARSER_ESCOLHIDO: Optional[tuple] = None
+
+
+def parser_html_ativo() -> str:
+    """Resolve PARSER_HTML para um backend instalado (html.parser sempre existe)."""
+    global _PARSER_ESCOLHIDO
+    if _PARSER_ESCOLHIDO is not None and _PARSER_ESCOLHIDO[0] == PARSER_HTML:
+        return _PARSER_ESCOLHIDO[1]
+    pedido = (PARSER_HTML or "auto").strip().lower()
+    candidatos = list(PARSERS_HTML) if pedido == "auto" else [pedido]
+    escolhido = next((n for n in candidatos if n in PARSERS_HTML and _backend_disponivel(n)), "html.parser")
+    if pedido not in ("auto", escolhido):
+        print(f"Parser HTML '{pedido}' indisponível; usando '{escolhido}'.", file=sys.stderr)
+    _PARSER_ESCOLHIDO = (PARSER_HTML, escolhido)
+    return escolhido
+
 
+def analisar_html(html: str) -> Dict[str, Any]:
+    """Parse + varredura única com o backend configurado (ver PARSER_HTML)."""
+    return PARSERS_HTML[parser_html_ativo()](html)
 
-def _extrai_jsonld(soup: BeautifulSoup):
+
+def _extrai_jsonld(blocos_brutos: List[str]):
     """Extrai telefone/e-mail/endereço/redes de possíveis blocos JSON-LD."""
     tels, emails, enderecos, redes = [], [], [], []
-    for node in soup.find_all('script', type='application/ld+json'):
-        if not isinstance(node, Tag):
-            continue
+    for raw in blocos_brutos:
         try:
-            raw = node.string if hasattr(node, "string") and node.string is not None else node.get_text()  # type: ignore[attr-defined]
             data = json.loads(raw or '')
         except Exception:
             continue
@@ -130,484 +483,3358 @@ def _extrai_jsonld(soup: BeautifulSoup):
     return _uniq(tels), _uniq(emails), _uniq(enderecos), _uniq(redes)
 
 # -------------------------------------------
-# Busca (Google)
+# Extratores (rodam sobre as visões de varrer_pagina)
 # -------------------------------------------
 
-def buscar_sites(consulta, num_sites=10):
+RE_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+RE_TELEFONE = re.compile(r"\(?\d{2}\)?\s?\d{4,5}[-\s]?\d{4}")
+RE_ENDERECO = re.compile(r"\b(?:Rua|Avenida|Av\.|Travessa|Praça|Rodovia|Estrada|Alameda|Largo|BR-|SP-|RJ-)\s+[^\n,]{3,120}")
+DOMINIOS_SOCIAIS = ('facebook.com', 'instagram.com', 'twitter.com', 'x.com', 'linkedin.com', 'wa.me', 'whatsapp.com')
+
+
+def extrair_emails(pagina: Dict[str, Any], email_ld: List[str]) -> List[str]:
+    emails = RE_EMAIL.findall(pagina["texto"])
+    for href in pagina["mailto"]:
+        emails.append(href.replace('mailto:', '').split('?')[0])
+    return _uniq(emails + email_ld)
+
+
+def extrair_telefones(pagina: Dict[str, Any], tel_ld: List[str]) -> List[str]:
+    telefones = []
+    for h, low in pagina["tel"]:
+        if low.startswith('tel:'):
+            telefones.append(h.replace('tel:', ''))
+        if 'wa.me/' in low or 'whatsapp.com/send' in low:
+            telefones.append('WhatsApp')
+    telefones += RE_TELEFONE.findall(pagina["texto"])
+    telefones = _uniq([t for t in telefones if len(_limpa_tel(t)) >= 10 or t == 'WhatsApp'])
+    return _uniq(telefones + tel_ld)
+
+
+def extrair_enderecos(pagina: Dict[str, Any], end_ld: List[str]) -> List[str]:
+    return _uniq(RE_ENDERECO.findall(pagina["texto"]) + end_ld)
+
+
+def extrair_links(pagina: Dict[str, Any], redes_ld: List[str], sites: bool, sociais: bool):
+    """Retorna (outros_sites, redes_sociais) a partir dos hrefs http(s)."""
+    outros_sites, redes_sociais = [], []
+    for href, low in pagina["http"]:
+        if sociais and any(s in low for s in DOMINIOS_SOCIAIS):
+            redes_sociais.append(href)
+        elif sites:
+            outros_sites.append(href)
+    return _uniq(outros_sites), _uniq(redes_sociais + redes_ld)
+
+
+def _decodificar_html(corpo: bytes, encoding: Optional[str]) -> str:
+    """Mesmo critério de resp.text: usa o charset do servidor ou detecta pelo conteúdo."""
+    if not encoding:
+        try:
+            import charset_normalizer
+            melhor = charset_normalizer.from_bytes(corpo).best()
+            encoding = melhor.encoding if melhor is not None else "utf-8"
+        except Exception:
+            encoding = "utf-8"
+    try:
+        return str(corpo, encoding, errors="replace")
+    except LookupError:
+        return str(corpo, "utf-8", errors="replace")
+
+
+def extrair_registro(corpo: bytes, encoding: Optional[str], flags: Dict[str, bool],
+                     base_url: Optional[str] = None) -> Dict[str, List[str]]:
     """
-    Compatível com 'googlesearch' e 'googlesearch-python' sem depender de kwargs específicos.
-    Busca e limita localmente a quantidade retornada.
+    Parse + todas as extrações habilitadas de uma página, de uma vez.
+    Função pura e serializável: é o que roda nos processos de extração e
+    só devolve o registro compacto (listas de contatos), nunca a árvore HTML.
+    Com `base_url`, inclui também "links_contato" (candidatas do crawler).
     """
-    try:
-        results = list(search(consulta))
-    except TypeError:
-        try:
-            results = list(search(consulta))
-        except Exception as e2:
-            print(f"Erro ao buscar sites para '{consulta}': {e2}")
-            return []
-    except Exception as e:
-        print(f"Erro ao buscar sites para '{consulta}': {e}")
-        return []
-    return results[:num_sites]
+    pagina = analisar_html(_decodificar_html(corpo, encoding))
+    tel_ld, email_ld, end_ld, redes_ld = _extrai_jsonld(pagina["jsonld"])
+    registro = {"emails": [], "telefones": [], "enderecos": [], "outros_sites": [], "redes_sociais": []}
+    if flags['email']:
+        registro["emails"] = extrair_emails(pagina, email_ld)
+    if flags['tel']:
+        registro["telefones"] = extrair_telefones(pagina, tel_ld)
+    if flags['endereco']:
+        registro["enderecos"] = extrair_enderecos(pagina, end_ld)
+    if flags['site'] or flags['social']:
+        outros, redes = extrair_links(pagina, redes_ld, flags['site'], flags['social'])
+        registro["outros_sites"] = outros if flags['site'] else []
+        registro["redes_sociais"] = redes if flags['social'] else []
+    if base_url:
+        registro["links_contato"] = links_contato(pagina, base_url)
+    return registro
 
 # -------------------------------------------
-# UI helpers (links clicáveis, render, etc.)
+# Extração em processos (opcional, contorna o GIL)
 # -------------------------------------------
 
-def insert_link(widget: tk.Text, url: str, display_text: Optional[str] = None):
-    """Insere um link clicável com cursor de mão."""
-    if not display_text:
-        display_text = url
-    start = widget.index(tk.END)
-    widget.insert(tk.END, display_text)
-    end = widget.index(tk.END)
-    tag = f"link_{start.replace('.', '_')}"
-    widget.tag_add(tag, start, end)
-    widget.tag_config(tag, foreground="blue", underline=True)
+_POOL_EXTRACAO: Optional[ProcessPoolExecutor] = None
+_POOL_EXTRACAO_LOCK = threading.Lock()
+
+
+def _criar_pool_extracao() -> Optional[ProcessPoolExecutor]:
+    """Abre o pool de processos da busca atual (None se PROCESSOS_EXTRACAO <= 0)."""
+    global _POOL_EXTRACAO
+    if PROCESSOS_EXTRACAO <= 0:
+        return None
+    with _POOL_EXTRACAO_LOCK:
+        if _POOL_EXTRACAO is None:
+            try:
+                # spawn em todas as plataformas: evita fork com threads de download ativas
+                _POOL_EXTRACAO = ProcessPoolExecutor(
+                    max_workers=PROCESSOS_EXTRACAO,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except Exception as e:
+                print(f"Pool de extração indisponível, extraindo em threads: {e}", file=sys.stderr)
+                return None
+        return _POOL_EXTRACAO
+
+
+def _encerrar_pool_extracao(cancelado: bool = False):
+    """Fecha o pool; se cancelado, descarta as páginas ainda na fila sem esperar."""
+    global _POOL_EXTRACAO
+    with _POOL_EXTRACAO_LOCK:
+        pool, _POOL_EXTRACAO = _POOL_EXTRACAO, None
+    if pool is not None:
+        pool.shutdown(wait=not cancelado, cancel_futures=cancelado)
+
 
-    def _open(_e=None, link=url):
+def _extrator_em_processo(pool: ProcessPoolExecutor, flags: Dict[str, bool]):
+    """Extrator que envia o HTML bruto ao pool e espera só o registro extraído."""
+    def _extrair(resp, base_url: Optional[str] = None):
         try:
-            webbrowser.open_new(link)
+            return pool.submit(extrair_registro, resp.content, resp.encoding, flags, base_url).result()
         except Exception:
-            pass
+            return None
+    return _extrair
 
-    def _enter(_e=None):
-        widget.config(cursor="hand2")
 
-    def _leave(_e=None):
-        widget.config(cursor="arrow")
+def _extrator_local(flags: Dict[str, bool]):
+    """Extrator na própria thread de download (sem pool de processos)."""
+    def _extrair(resp, base_url: Optional[str] = None):
+        try:
+            return extrair_registro(resp.content, resp.encoding, flags, base_url)
+        except Exception:
+            return None
+    return _extrair
 
-    widget.tag_bind(tag, "<Button-1>", _open)
-    widget.tag_bind(tag, "<Enter>", _enter)
-    widget.tag_bind(tag, "<Leave>", _leave)
+# -------------------------------------------
+# Cliente HTTP (sessão compartilhada)
+# -------------------------------------------
 
+_SESSAO: Optional[requests.Session] = None
+_SESSAO_LOCK = threading.Lock()
 
-def render_results(results: List[Dict[str, Any]]):
-    """Mostra resultados com links clicáveis (urls, e-mails, telefones)."""
-    if resultado_text is None:
-        return
-    try:
-        resultado_text.delete(1.0, tk.END)
-        resultado_text.insert(tk.END, "=== Resultados ===\n")
 
-        if not results:
-            resultado_text.insert(tk.END, "\nNenhum site foi encontrado para a consulta.\n")
-            return
+def _criar_sessao() -> requests.Session:
+    """
+    Sessão com keep-alive, pools dimensionados para os downloads simultâneos,
+    novas tentativas em erros transitórios e compressão (gzip/deflate e br
+    quando o pacote brotli estiver instalado).
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry, make_headers
+    sessao = requests.Session()
 
-        for item in results:
-            site = item.get("site", "")
-            emails = item.get("emails", [])
-            telefones = item.get("telefones", [])
-            enderecos = item.get("enderecos", [])
-            outros_sites = item.get("outros_sites", [])
-            redes_sociais = item.get("redes_sociais", [])
-
-            resultado_text.insert(tk.END, "\n🔗 Site: ")
-            if site:
-                insert_link(resultado_text, site, site)
-            resultado_text.insert(tk.END, "\n")
-
-            if emails:
-                resultado_text.insert(tk.END, "📧 E-mails encontrados:\n")
-                for email in emails:
-                    resultado_text.insert(tk.END, "   - ")
-                    insert_link(resultado_text, f"mailto:{email}", email)
-                    resultado_text.insert(tk.END, "\n")
-            else:
-                resultado_text.insert(tk.END, "Nenhum e-mail encontrado.\n")
-
-            if telefones:
-                resultado_text.insert(tk.END, "📞 Telefones encontrados:\n")
-                for tel in telefones:
-                    resultado_text.insert(tk.END, "   - ")
-                    if isinstance(tel, str) and tel.lower() == "whatsapp":
-                        resultado_text.insert(tk.END, "WhatsApp\n")
-                    else:
-                        tel_digits = re.sub(r"\D", "", tel)
-                        if tel_digits:
-                            insert_link(resultado_text, f"tel:{tel_digits}", tel)
-                            resultado_text.insert(tk.END, "\n")
-                        else:
-                            resultado_text.insert(tk.END, f"{tel}\n")
-            else:
-                resultado_text.insert(tk.END, "Nenhum telefone encontrado.\n")
+    class _Retry(Retry):
+        def increment(self, *args, **kwargs):
+            # Requisição derrubada pelo cancelamento não é repetida
+            pendente = getattr(_REQUISICAO, "pendente", None)
+            if pendente is not None and pendente.fechada:
+                raise BuscaCancelada("requisição cancelada")
+            return super().increment(*args, **kwargs)
 
-            if enderecos:
-                resultado_text.insert(tk.END, "🏠 Endereços encontrados:\n")
-                for end in enderecos:
-                    resultado_text.insert(tk.END, f"   - {end}\n")
-            else:
-                resultado_text.insert(tk.END, "Nenhum endereço encontrado.\n")
-
-            if outros_sites:
-                resultado_text.insert(tk.END, "🌐 Outros sites encontrados:\n")
-                for s in outros_sites:
-                    resultado_text.insert(tk.END, "   - ")
-                    insert_link(resultado_text, s, s)
-                    resultado_text.insert(tk.END, "\n")
-            else:
-                resultado_text.insert(tk.END, "Nenhum site encontrado.\n")
-
-            if redes_sociais:
-                resultado_text.insert(tk.END, "🔗 Redes sociais encontradas:\n")
-                for r in redes_sociais:
-                    resultado_text.insert(tk.END, "   - ")
-                    insert_link(resultado_text, r, r)
-                    resultado_text.insert(tk.END, "\n")
-            else:
-                resultado_text.insert(tk.END, "Nenhuma rede social encontrada.\n")
+    retry = _Retry(
+        total=HTTP_TENTATIVAS,
+        connect=HTTP_TENTATIVAS,
+        read=HTTP_TENTATIVAS,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = _adaptador_rastreado(HTTPAdapter)(
+        pool_connections=max(10, MAX_DOWNLOADS_SIMULTANEOS),
+        pool_maxsize=max(10, MAX_DOWNLOADS_SIMULTANEOS),
+        max_retries=retry,
+    )
+    sessao.mount("http://", adapter)
+    sessao.mount("https://", adapter)
+    sessao.headers.update(_headers())
+    sessao.headers.update(make_headers(accept_encoding=True))
+    return sessao
 
-    except Exception as e:
-        print(f"Erro ao renderizar resultados: {e}")
 
-# -------------------------------------------
-# UF / Município
-# -------------------------------------------
+# Requisição em andamento na thread (ver _ConexaoPendente)
+_REQUISICAO = threading.local()
 
-def carregar_estados():
-    if estado_combo is None or cidade_combo is None:
-        return
-    ufs_legiveis = [f"{sigla} - {nome}" for sigla, nome in UFS]
-    estado_combo["values"] = ufs_legiveis
-    estado_combo.set("")
-    cidade_combo.set("")
-    cidade_combo["values"] = []
 
+class _ConexaoPendente:
+    """
+    Conexão de uma requisição que ainda não devolveu os cabeçalhos. Fica
+    registrada no token de cancelamento durante o get(); close() derruba o
+    socket, então um host que aceita a conexão e não responde também é
+    interrompido ao cancelar (depois dos cabeçalhos vale a resposta).
+    """
 
-def on_estado_selecionado(event=None):
-    if estado_combo is None or cidade_combo is None:
-        return
-    valor = estado_combo.get().strip()
-    if not valor:
-        cidade_combo["values"] = []
-        cidade_combo.set("")
-        return
-    sigla = valor.split(" - ")[0]
-    if sigla in MUNICIPIOS_CACHE:
-        cidade_combo["values"] = MUNICIPIOS_CACHE[sigla]
-        cidade_combo.set("")
-        return
-    try:
-        url = f"https://servicodados.ibge.gov.br/api/v1/localidades/estados/{sigla}/municipios"
-        resp = requests.get(url, headers=_headers(), timeout=10)
-        if resp.status_code == 200:
-            dados = resp.json()
-            cidades = sorted([item.get("nome", "") for item in dados if item.get("nome")])
-            MUNICIPIOS_CACHE[sigla] = cidades
-            cidade_combo["values"] = cidades
-            cidade_combo.set("")
-        else:
-            cidade_combo["values"] = []
-            cidade_combo.set("")
-        if root is not None:
-            root.update_idletasks()
-    except Exception as e:
-        print(f"Erro ao buscar municípios do IBGE ({sigla}): {e}")
-        cidade_combo["values"] = []
-        cidade_combo.set("")
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conexao = None
+        self.fechada = False
 
+    def acompanhar(self, conexao):
+        with self._lock:
+            self._conexao = conexao
+            fechada = self.fechada
+        if fechada:
+            self._derrubar(conexao)
 
-def get_localidade_text():
-    if estado_combo is None or cidade_combo is None:
-        return ""
-    uf = estado_combo.get().strip()
-    cidade = cidade_combo.get().strip()
-    sigla = uf.split(" - ")[0] if (" - " in uf) else uf
-    if cidade and sigla:
-        return f"{cidade} - {sigla}"
-    if sigla:
-        return sigla
-    return ""
+    def close(self):
+        with self._lock:
+            self.fechada = True
+            conexao = self._conexao
+        if conexao is not None:
+            self._derrubar(conexao)
 
-# -------------------------------------------
-# Progresso (UI)
-# -------------------------------------------
+    @staticmethod
+    def _derrubar(conexao):
+        sock = getattr(conexao, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
 
-def _ui_begin_indeterminado():
-    if status_label is not None:
-        status_label.config(text="Procurando…")
-    if progress is not None:
-        progress.configure(mode="indeterminate")
-        progress.start(12)
-    if btn_buscar is not None:
-        btn_buscar.config(state="disabled")
-    if btn_limpar is not None:
-        btn_limpar.config(state="disabled")
-    if btn_planilha is not None:
-        btn_planilha.config(state="disabled")
-    if btn_cancelar is not None:
-        btn_cancelar.config(state="normal")
 
+def _adaptador_rastreado(base):
+    """
+    HTTPAdapter cujos pools usam conexões que se anunciam em
+    _REQUISICAO.pendente ao conectar e a cada requisição (inclusive em
+    conexões keep-alive reaproveitadas).
+    """
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
-def _ui_begin_determinado(total: int):
-    if status_label is not None:
-        status_label.config(text="Procurando (0/{} – 0%)…".format(total))
-    if progress is not None:
-        progress.configure(mode="determinate", maximum=total)
-        progress['value'] = 0
-    if btn_buscar is not None:
-        btn_buscar.config(state="disabled")
-    if btn_limpar is not None:
-        btn_limpar.config(state="disabled")
-    if btn_planilha is not None:
-        btn_planilha.config(state="disabled")
-    if btn_cancelar is not None:
-        btn_cancelar.config(state="normal")
+    class _Rastreada:
+        def _anunciar(self):
+            pendente = getattr(_REQUISICAO, "pendente", None)
+            if pendente is not None:
+                pendente.acompanhar(self)
 
+        def connect(self):
+            super().connect()  # type: ignore[misc]
+            self._anunciar()
 
-def _ui_step(atual: int, total: int, dominio: str = ""):
-    if progress is not None:
-        progress['value'] = atual
-    pct = int((atual / total) * 100) if total else 0
-    label_dom = f" – {dominio}" if dominio else ""
-    if status_label is not None:
-        status_label.config(text=f"Procurando ({atual}/{total} – {pct}%){label_dom}")
+        def request(self, *args, **kwargs):
+            self._anunciar()
+            return super().request(*args, **kwargs)  # type: ignore[misc]
 
+    class _ConexaoHTTP(_Rastreada, HTTPConnection):
+        pass
 
-def _ui_end(cancelado: bool = False):
-    try:
-        if progress is not None:
-            progress.stop()
-    except Exception:
+    class _ConexaoHTTPS(_Rastreada, HTTPSConnection):
         pass
-    if btn_buscar is not None:
-        btn_buscar.config(state="normal")
-    if btn_limpar is not None:
-        btn_limpar.config(state="normal")
-    if btn_planilha is not None:
-        btn_planilha.config(state="normal")
-    if btn_cancelar is not None:
-        btn_cancelar.config(state="disabled")
-    if status_label is not None:
-        status_label.config(text="Cancelado" if cancelado else "Concluído!")
 
+    class _PoolHTTP(HTTPConnectionPool):
+        ConnectionCls = _ConexaoHTTP
 
-def cancelar_busca():
-    global CANCELAR
-    CANCELAR = True
+    class _PoolHTTPS(HTTPSConnectionPool):
+        ConnectionCls = _ConexaoHTTPS
 
-# -------------------------------------------
-# Thread de busca (com passos granulares)
-# -------------------------------------------
+    class _Adaptador(base):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {"http": _PoolHTTP, "https": _PoolHTTPS}
 
-def _calc_passos_por_site(flags: Dict[str, bool]) -> int:
-    # Base: 2 passos (requisição + parse)
-    passos = 2
-    # Cada tipo de extração vira um passo
-    if flags['email']:
-        passos += 1
-    if flags['tel']:
-        passos += 1
-    if flags['endereco']:
-        passos += 1
-    # Varredura de hrefs (sites/redes) é mais um passo se alguma dessas estiver ativa
-    if flags['site'] or flags['social']:
-        passos += 1
-    return passos
+    return _Adaptador
 
 
-def buscar_thread():
-    global CANCELAR, TOTAL_PASSOS, PASSOS_CONCLUIDOS, SEARCH_RESULTS
-    CANCELAR = False
-    PASSOS_CONCLUIDOS = 0
+def http_sessao() -> requests.Session:
+    """Retorna a sessão HTTP compartilhada (criada no primeiro uso)."""
+    global _SESSAO
+    with _SESSAO_LOCK:
+        if _SESSAO is None:
+            _SESSAO = _criar_sessao()
+        return _SESSAO
 
-    busca = entry_busca.get().strip() if 'entry_busca' in globals() else ''
-    localidade = entry_localidade.get().strip() if 'entry_localidade' in globals() else ''
-    cidade = get_localidade_text()
-    flags = {
-        'email': var_email.get() if 'var_email' in globals() else True,
-        'tel': var_tel.get() if 'var_tel' in globals() else True,
-        'endereco': var_endereco.get() if 'var_endereco' in globals() else False,
-        'site': var_site.get() if 'var_site' in globals() else False,
-        'social': var_social.get() if 'var_social' in globals() else False,
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET pela sessão compartilhada; todo acesso à rede passa por aqui."""
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    return http_sessao().get(url, **kwargs)
+
+
+class ErroDownload(IOError):
+    """
+    Base dos erros de download próprios; como requests.RequestException
+    (também um IOError), guarda a resposta em `.response`, sem importar
+    requests na carga do módulo.
+    """
+
+    def __init__(self, *args, response=None):
+        super().__init__(*args)
+        self.response = response
+
+
+class ConteudoIgnorado(ErroDownload):
+    """Resposta descartada antes de baixar o corpo (ex.: PDF, imagem)."""
+
+
+class BuscaCancelada(ErroDownload):
+    """Download interrompido porque a busca foi cancelada."""
+
+
+class FalhaBusca(ErroDownload):
+    """O buscador falhou (bloqueio/429, rede): a consulta não foi feita por inteiro."""
+
+
+def _tipo_conteudo(resp: requests.Response) -> str:
+    return (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+
+_SEMAFORO_DOWNLOADS: Optional[threading.BoundedSemaphore] = None
+_SEMAFORO_DOWNLOADS_LOCK = threading.Lock()
+
+
+def _semaforo_downloads() -> threading.BoundedSemaphore:
+    global _SEMAFORO_DOWNLOADS
+    with _SEMAFORO_DOWNLOADS_LOCK:
+        if _SEMAFORO_DOWNLOADS is None:
+            _SEMAFORO_DOWNLOADS = threading.BoundedSemaphore(max(1, MAX_DOWNLOADS_SIMULTANEOS))
+        return _SEMAFORO_DOWNLOADS
+
+
+def http_get_pagina(url: str, max_bytes: Optional[int] = None,
+                    tipos: Optional[Tuple[str, ...]] = None,
+                    cancel: Optional[Cancelamento] = None, **kwargs) -> requests.Response:
+    """
+    GET em streaming para páginas: confere o Content-Type assim que chegam os
+    cabeçalhos (levanta ConteudoIgnorado se não estiver em `tipos`, por padrão
+    TIPOS_HTML) e lê no máximo `max_bytes` (MAX_BYTES_PAGINA) do corpo já
+    descomprimido. A resposta devolvida tem o corpo limitado já carregado
+    (resp.content / resp.text). Com `cancel`, a resposta fica registrada no
+    token enquanto o corpo é lido, e cancelar a busca aborta a leitura.
+    Todo download ocupa uma das MAX_DOWNLOADS_SIMULTANEOS vagas globais
+    (pipeline, crawler, robots.txt e sitemaps dividem o mesmo limite).
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    sem = _semaforo_downloads()
+    while not sem.acquire(timeout=0.1):
+        if cancel.cancelado:
+            raise BuscaCancelada(url)
+    try:
+        return _get_pagina(url, max_bytes, tipos, cancel, **kwargs)
+    finally:
+        sem.release()
+
+
+def _get_pagina(url: str, max_bytes: Optional[int], tipos: Optional[Tuple[str, ...]],
+                cancel: Cancelamento, **kwargs) -> requests.Response:
+    limite = max_bytes or MAX_BYTES_PAGINA
+    aceitos = tipos or TIPOS_HTML
+    if cancel.cancelado:
+        raise BuscaCancelada(url)
+    kwargs.setdefault("timeout", (HTTP_TIMEOUT_CONEXAO, HTTP_TIMEOUT))
+    pendente = _ConexaoPendente()
+    _REQUISICAO.pendente = pendente
+    cancel.registrar(pendente)
+    try:
+        resp = http_sessao().get(url, stream=True, **kwargs)
+    except Exception:
+        if cancel.cancelado:
+            raise BuscaCancelada(url) from None
+        raise
+    finally:
+        _REQUISICAO.pendente = None
+        cancel.liberar(pendente)
+    cancel.registrar(resp)
+    try:
+        corpo = b""
+        if resp.status_code == 200:
+            tipo = _tipo_conteudo(resp)
+            if tipo and tipo not in aceitos:
+                raise ConteudoIgnorado(f"Conteúdo '{tipo}' ignorado: {url}", response=resp)
+            partes: List[bytes] = []
+            total = 0
+            for bloco in resp.iter_content(64 * 1024):
+                if cancel.cancelado:
+                    raise BuscaCancelada(url)
+                partes.append(bloco)
+                total += len(bloco)
+                if total >= limite:
+                    break
+            corpo = b"".join(partes)[:limite]
+        resp._content = corpo  # type: ignore[attr-defined]
+        resp._content_consumed = True  # type: ignore[attr-defined]
+    finally:
+        # Se o orçamento cortou a leitura, a conexão é descartada em vez de drenada
+        cancel.liberar(resp)
+        resp.close()
+    if cancel.cancelado:
+        raise BuscaCancelada(url)
+    return resp
+
+# -------------------------------------------
+# Cache de páginas (SQLite, TTL + LRU + revalidação)
+# -------------------------------------------
+
+def normalizar_url(url: str) -> str:
+    """Normaliza a URL para uso como chave (host minúsculo, sem fragmento, query ordenada)."""
+    try:
+        p = urlparse(url.strip())
+    except Exception:
+        return url
+    scheme = (p.scheme or "http").lower()
+    host = (p.hostname or "").lower()
+    porta = p.port
+    if porta and not ((scheme == "http" and porta == 80) or (scheme == "https" and porta == 443)):
+        host = f"{host}:{porta}"
+    query = urlencode(sorted(parse_qsl(p.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, p.path or "/", p.params, query, ""))
+
+
+def _resposta_do_cache(url: str, corpo: bytes, encoding: Optional[str], headers: Dict[str, str]) -> requests.Response:
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = corpo  # type: ignore[attr-defined]
+    resp.encoding = encoding
+    resp.url = url
+    resp.headers = CaseInsensitiveDict(headers)
+    resp.from_cache = True  # type: ignore[attr-defined]
+    return resp
+
+
+def conectar_sqlite(caminho: str, compartilhado: bool = False, timeout: float = 30,
+                    **kwargs) -> sqlite3.Connection:
+    """
+    Abre (criando a pasta) um banco SQLite usado por várias threads.
+    Local: journal WAL (leitores não bloqueiam o escritor). `compartilhado`
+    (arquivo que pode estar em disco de rede, aberto por outras máquinas):
+    journal clássico (DELETE), porque o WAL depende de memória compartilhada
+    entre os processos e não funciona em disco de rede.
+    """
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    conn = sqlite3.connect(caminho, timeout=timeout, check_same_thread=False, **kwargs)
+    conn.execute("PRAGMA journal_mode=DELETE" if compartilhado else "PRAGMA journal_mode=WAL")
+    return conn
+
+
+class CachePaginas:
+    """
+    Cache persistente de respostas HTTP 200 em SQLite.
+    - TTL: entradas dentro da validade são servidas sem acessar a rede;
+    - vencidas com ETag/Last-Modified são revalidadas com GET condicional;
+    - tamanho limitado: remove as menos acessadas (LRU) ao passar do limite.
+    Erros do SQLite (ex.: banco travado por outro processo) só contam em
+    "erros": a página baixada é devolvida mesmo que não entre no cache.
+    """
+
+    def __init__(self, caminho: str, ttl: int = CACHE_PAGINAS_TTL,
+                 max_bytes: int = CACHE_PAGINAS_MAX_BYTES):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidados": 0, "gravados": 0, "removidos": 0,
+                      "erros": 0}
+        self._conn = conectar_sqlite(caminho)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS paginas (
+                url TEXT PRIMARY KEY,
+                corpo BLOB NOT NULL,
+                encoding TEXT,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                baixado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL,
+                tamanho INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_paginas_acesso ON paginas(acessado_em)")
+        self._conn.commit()
+
+    def _conta(self, chave: str):
+        self.stats[chave] += 1
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            dados = dict(self.stats)
+            row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM paginas").fetchone()
+        dados["entradas"], dados["bytes"] = int(row[0]), int(row[1])
+        return dados
+
+    def _erro(self, operacao: str, e: sqlite3.Error):
+        """Chamado com self._lock: desfaz a transação e segue sem o cache."""
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+        self._conta("erros")
+        print(f"Cache de páginas ({operacao}): {e}", file=sys.stderr)
+
+    def _ler(self, chave: str):
+        with self._lock:
+            try:
+                return self._conn.execute(
+                    "SELECT corpo, encoding, content_type, etag, last_modified, baixado_em FROM paginas WHERE url = ?",
+                    (chave,),
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._erro("leitura", e)
+                return None
+
+    def _tocar(self, chave: str, revalidado: bool = False):
+        agora = time.time()
+        with self._lock:
+            try:
+                if revalidado:
+                    self._conn.execute("UPDATE paginas SET acessado_em = ?, baixado_em = ? WHERE url = ?",
+                                       (agora, agora, chave))
+                else:
+                    self._conn.execute("UPDATE paginas SET acessado_em = ? WHERE url = ?", (agora, chave))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._erro("acesso", e)
+
+    def _gravar(self, chave: str, resp: requests.Response):
+        corpo = resp.content or b""
+        if len(corpo) > self.max_bytes:
+            return
+        agora = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO paginas "
+                    "(url, corpo, encoding, content_type, etag, last_modified, baixado_em, acessado_em, tamanho) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (chave, corpo, resp.encoding, resp.headers.get("Content-Type"),
+                     resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                     agora, agora, len(corpo)),
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._erro("gravação", e)
+                return
+            self._conta("gravados")
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM paginas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excesso = total - self.max_bytes
+        for url, tamanho in self._conn.execute(
+                "SELECT url, tamanho FROM paginas ORDER BY acessado_em ASC").fetchall():
+            if excesso <= 0:
+                break
+            self._conn.execute("DELETE FROM paginas WHERE url = ?", (url,))
+            excesso -= tamanho
+            self._conta("removidos")
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET com cache: serve do disco, revalida ou baixa e grava."""
+        chave = normalizar_url(url)
+        row = self._ler(chave)
+        if row is not None:
+            corpo, encoding, content_type, etag, last_modified, baixado_em = row
+            headers = {"Content-Type": content_type or ""}
+            if time.time() - baixado_em < self.ttl:
+                self._tocar(chave)
+                with self._lock:
+                    self._conta("hits")
+                return _resposta_do_cache(url, corpo, encoding, headers)
+            condicionais = {}
+            if etag:
+                condicionais["If-None-Match"] = etag
+            if last_modified:
+                condicionais["If-Modified-Since"] = last_modified
+            if condicionais:
+                extra = dict(kwargs.pop("headers", None) or {})
+                extra.update(condicionais)
+                resp = http_get_pagina(url, headers=extra, **kwargs)
+                if resp.status_code == 304:
+                    self._tocar(chave, revalidado=True)
+                    with self._lock:
+                        self._conta("revalidados")
+                    return _resposta_do_cache(url, corpo, encoding, headers)
+                if resp.status_code == 200:
+                    self._gravar(chave, resp)
+                with self._lock:
+                    self._conta("misses")
+                return resp
+        with self._lock:
+            self._conta("misses")
+        resp = http_get_pagina(url, **kwargs)
+        if resp.status_code == 200:
+            self._gravar(chave, resp)
+        return resp
+
+    def limpar(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM paginas")
+            self._conn.commit()
+
+
+_CACHE_PAGINAS: Optional[CachePaginas] = None
+_CACHE_PAGINAS_LOCK = threading.Lock()
+
+
+def cache_paginas() -> Optional[CachePaginas]:
+    """Cache de páginas compartilhado (None se desativado ou indisponível)."""
+    global _CACHE_PAGINAS
+    if not CACHE_PAGINAS_ATIVO:
+        return None
+    with _CACHE_PAGINAS_LOCK:
+        if _CACHE_PAGINAS is None:
+            try:
+                _CACHE_PAGINAS = CachePaginas(os.path.join(DIR_DADOS, "cache_paginas.sqlite3"))
+            except Exception as e:
+                print(f"Cache de páginas indisponível: {e}", file=sys.stderr)
+                return None
+        return _CACHE_PAGINAS
+
+
+def resumo_cache_paginas() -> str:
+    """Linha com acertos/faltas do cache deste processo ("" se ele não foi usado)."""
+    if _CACHE_PAGINAS is None:
+        return ""
+    try:
+        e = _CACHE_PAGINAS.estatisticas()
+    except sqlite3.Error:
+        e = dict(_CACHE_PAGINAS.stats, entradas=0, bytes=0)
+    consultas = e["hits"] + e["misses"] + e["revalidados"]
+    taxa = 100 * (e["hits"] + e["revalidados"]) / consultas if consultas else 0
+    return (f"Cache de páginas: {e['hits']} acertos, {e['revalidados']} revalidadas, "
+            f"{e['misses']} faltas ({taxa:.0f}% servidas do disco), {e['erros']} erros; "
+            f"{e['entradas']} páginas, {e['bytes'] / 1e6:.1f} MB")
+
+
+def http_get_cache(url: str, **kwargs) -> requests.Response:
+    """GET de página (streaming, com limite de bytes) passando pelo cache em disco quando ativo."""
+    cache = cache_paginas()
+    if cache is None:
+        return http_get_pagina(url, **kwargs)
+    return cache.get(url, **kwargs)
+
+# -------------------------------------------
+# Busca (Google)
+# -------------------------------------------
+
+def normalizar_consulta(consulta: str) -> str:
+    """Chave da consulta: minúsculas, espaços colapsados e forma Unicode NFC."""
+    return " ".join(unicodedata.normalize("NFC", consulta or "").casefold().split())
+
+
+class CacheBuscas:
+    """
+    Memoiza resultados do buscador por consulta normalizada.
+    Mantém um LRU em memória e, opcionalmente, uma cópia em SQLite
+    (que pode ficar numa pasta compartilhada pela equipe via
+    ARQUIVO_CACHE_BUSCAS / PROCURA_CACHE_BUSCAS).
+    """
+
+    def __init__(self, caminho: Optional[str] = None, ttl: int = CACHE_BUSCAS_TTL,
+                 max_entradas: int = CACHE_BUSCAS_MAX):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        if caminho:
+            self._conn = conectar_sqlite(caminho, compartilhado=True)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS buscas (
+                    chave TEXT PRIMARY KEY,
+                    urls TEXT NOT NULL,
+                    pedidos INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_buscas_acesso ON buscas(acessado_em)")
+            self._conn.commit()
+
+    def get(self, consulta: str, num_sites: int) -> Optional[List[str]]:
+        """URLs em cache para a consulta, se válidas e suficientes para num_sites."""
+        chave = normalizar_consulta(consulta)
+        agora = time.time()
+        with self._lock:
+            entrada = self._mem.get(chave)
+            if entrada is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT urls, pedidos, criado_em FROM buscas WHERE chave = ?", (chave,)
+                ).fetchone()
+                if row is not None:
+                    entrada = (json.loads(row[0]), int(row[1]), float(row[2]))
+            if entrada is not None:
+                urls, pedidos, criado_em = entrada
+                # Serve se ainda válido e se a busca original pediu ao menos num_sites
+                # (ou se já devolveu resultados suficientes)
+                if agora - criado_em < self.ttl and (pedidos >= num_sites or len(urls) >= num_sites):
+                    self._mem[chave] = entrada
+                    self._mem.move_to_end(chave)
+                    self._limitar_mem()
+                    if self._conn is not None:
+                        self._conn.execute("UPDATE buscas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+                        self._conn.commit()
+                    self.stats["hits"] += 1
+                    return list(urls)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, consulta: str, urls: List[str], num_sites: int):
+        chave = normalizar_consulta(consulta)
+        agora = time.time()
+        entrada = (list(urls), int(num_sites), agora)
+        with self._lock:
+            self._mem[chave] = entrada
+            self._mem.move_to_end(chave)
+            self._limitar_mem()
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buscas (chave, urls, pedidos, criado_em, acessado_em) VALUES (?, ?, ?, ?, ?)",
+                    (chave, json.dumps(entrada[0]), entrada[1], agora, agora),
+                )
+                self._conn.execute(
+                    "DELETE FROM buscas WHERE chave IN ("
+                    " SELECT chave FROM buscas ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entradas,),
+                )
+                self._conn.execute("DELETE FROM buscas WHERE criado_em < ?", (agora - self.ttl,))
+                self._conn.commit()
+
+    def _limitar_mem(self):
+        while len(self._mem) > self.max_entradas:
+            self._mem.popitem(last=False)
+
+
+_CACHE_BUSCAS: Optional[CacheBuscas] = None
+_CACHE_BUSCAS_LOCK = threading.Lock()
+
+
+def cache_buscas() -> Optional[CacheBuscas]:
+    """Cache de buscas compartilhado (None se desativado)."""
+    global _CACHE_BUSCAS
+    if not CACHE_BUSCAS_ATIVO:
+        return None
+    with _CACHE_BUSCAS_LOCK:
+        if _CACHE_BUSCAS is None:
+            caminho = None
+            if CACHE_BUSCAS_DISCO:
+                caminho = ARQUIVO_CACHE_BUSCAS or os.path.join(DIR_DADOS, "cache_buscas.sqlite3")
+            try:
+                _CACHE_BUSCAS = CacheBuscas(caminho)
+            except Exception as e:
+                print(f"Cache de buscas em disco indisponível: {e}", file=sys.stderr)
+                _CACHE_BUSCAS = CacheBuscas(None)
+        return _CACHE_BUSCAS
+
+
+def search(*args, **kwargs):
+    """googlesearch.search, importado só na primeira busca."""
+    from googlesearch import search as _search
+    return _search(*args, **kwargs)
+
+
+def _resultados_buscador(consulta: str, num_sites: int):
+    """
+    Gera URLs do buscador sob demanda. Pede uma folga acima de num_sites
+    (resultados repetidos/inúteis são descartados), mas como é um gerador
+    o buscador só pagina enquanto o consumidor continuar lendo.
+    """
+    try:
+        return search(consulta, num_results=num_sites * 3)
+    except TypeError:
+        # Fallback sem kwargs (alguns ambientes variam a assinatura)
+        return search(consulta)
+
+
+def _url_utilizavel(url) -> bool:
+    if not isinstance(url, str):
+        return False
+    p = urlparse(url.strip())
+    return p.scheme in ("http", "https") and bool(p.netloc)
+
+
+def buscar_sites(consulta, num_sites=10, cancel: Optional[Cancelamento] = None):
+    """
+    Compatível com 'googlesearch' e 'googlesearch-python' sem depender de kwargs específicos.
+    Gerador: entrega cada URL única e utilizável assim que o buscador a devolve
+    e para de consumir o buscador ao atingir num_sites (ou ao cancelar).
+    Consultas repetidas são servidas pelo cache de buscas. Se o buscador
+    falhar, levanta FalhaBusca (e nada vai para o cache).
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    cache = cache_buscas()
+    if cache is not None:
+        em_cache = cache.get(consulta, num_sites)
+        if em_cache is not None:
+            yield from em_cache[:num_sites]
+            return
+    vistos = set()
+    entregues: List[str] = []
+    completo = False
+    fonte = None
+    try:
+        fonte = iter(_resultados_buscador(consulta, num_sites))
+        while len(entregues) < num_sites and not cancel.cancelado:
+            try:
+                url = next(fonte)
+            except StopIteration:
+                break
+            if not _url_utilizavel(url):
+                continue
+            url = url.strip()
+            chave = normalizar_url(url)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            entregues.append(url)
+            yield url
+        completo = not cancel.cancelado
+    except Exception as e:
+        raise FalhaBusca(f"Erro ao buscar sites para '{consulta}': {e}") from e
+    finally:
+        fechar = getattr(fonte, "close", None)
+        if callable(fechar):
+            try:
+                fechar()
+            except Exception:
+                pass
+    if completo and cache is not None and entregues:
+        cache.put(consulta, entregues, num_sites)
+
+# -------------------------------------------
+# Download concorrente
+# -------------------------------------------
+
+_SEMAFOROS_HOST: "OrderedDict[str, threading.BoundedSemaphore]" = OrderedDict()
+_SEMAFOROS_HOST_LOCK = threading.Lock()
+
+
+def _semaforo_host(host: str, limite: int) -> threading.BoundedSemaphore:
+    with _SEMAFOROS_HOST_LOCK:
+        sem = _SEMAFOROS_HOST.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(max(1, limite))
+            _SEMAFOROS_HOST[host] = sem
+            # O menos usado está ocioso na prática (bem menos downloads que hosts)
+            while len(_SEMAFOROS_HOST) > MAX_HOSTS_MEMORIA:
+                _SEMAFOROS_HOST.popitem(last=False)
+        else:
+            _SEMAFOROS_HOST.move_to_end(host)
+        return sem
+
+
+def _baixar_site(site: str, limite_host: int, cancel: Optional[Cancelamento] = None):
+    """Baixa um site respeitando o limite por host. Retorna a resposta ou None."""
+    cancel = cancel or SEM_CANCELAMENTO
+    if cancel.cancelado:
+        return None
+    host = (urlparse(site).netloc or site).lower()
+    sem = _semaforo_host(host, limite_host)
+    # Espera a vaga do host sem ficar presa se a busca for cancelada
+    while not sem.acquire(timeout=0.1):
+        if cancel.cancelado:
+            return None
+    try:
+        if cancel.cancelado:
+            return None
+        try:
+            resp = http_get_cache(site, cancel=cancel)
+        except Exception:
+            return None
+        if resp.status_code == 200:
+            _contar_pagina()
+        return resp
+    finally:
+        sem.release()
+
+
+def _baixar_e_processar(site: str, limite_host: int, pos_download, cancel: Cancelamento):
+    resp = _baixar_site(site, limite_host, cancel)
+    extra = None
+    if pos_download is not None and not cancel.cancelado:
+        try:
+            extra = pos_download(site, resp)
+        except Exception:
+            extra = None
+    return resp, extra
+
+
+_FIM_BUSCA = object()
+_CANCELOU = object()
+
+
+def baixar_sites(sites: Iterable[str], max_workers: Optional[int] = None,
+                 max_por_host: Optional[int] = None,
+                 ao_fim_busca: Optional[Callable[[int], None]] = None,
+                 pos_download: Optional[Callable[[str, Any], Any]] = None,
+                 cancel: Optional[Cancelamento] = None):
+    """
+    Pipeline busca → download: consome `sites` (lista ou gerador do buscador)
+    numa thread própria e envia cada URL ao pool assim que ela aparece, sem
+    esperar a busca terminar. Gera (indice, site, resp, extra) conforme cada
+    download termina; o índice é a posição no buscador e permite ao chamador
+    manter a ordem original dos resultados. `extra` é o retorno de
+    `pos_download(site, resp)`, executado ainda na thread de download
+    (ex.: extração num pool de processos), ou None.
+
+    Contrapressão: no máximo FILA_PIPELINE sites ficam baixando ou aguardando
+    consumo; além disso o buscador não é mais lido.
+    `ao_fim_busca(total)` é chamado quando o buscador se esgota. Se o
+    buscador falhar, os sites já entregues são concluídos e então a falha
+    (FalhaBusca) é levantada.
+
+    Ao cancelar `cancel`, o gerador para na hora: a fila é acordada, os
+    downloads ainda não iniciados são descartados e os em andamento abortados.
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    workers = max(1, max_workers or MAX_DOWNLOADS_SIMULTANEOS)
+    por_host = max_por_host or MAX_DOWNLOADS_POR_HOST
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download")
+    saida: "queue.Queue" = queue.Queue()
+    vagas = threading.Semaphore(max(workers, FILA_PIPELINE))
+    parar = threading.Event()
+    falhas: List[Exception] = []
+
+    def _produtor():
+        total = 0
+        fonte = iter(sites)
+        try:
+            for i, site in enumerate(fonte):
+                while not vagas.acquire(timeout=0.1):
+                    if parar.is_set() or cancel.cancelado:
+                        return
+                if parar.is_set() or cancel.cancelado:
+                    return
+                fut = pool.submit(_baixar_e_processar, site, por_host, pos_download, cancel)
+                fut.add_done_callback(lambda f, i=i, site=site: saida.put((i, site, f)))
+                total = i + 1
+        except Exception as e:
+            if not parar.is_set():
+                falhas.append(e if isinstance(e, FalhaBusca)
+                              else FalhaBusca(f"Erro no pipeline de busca: {e}"))
+        finally:
+            fechar = getattr(fonte, "close", None)
+            if callable(fechar):
+                try:
+                    fechar()
+                except Exception:
+                    pass
+            saida.put((_FIM_BUSCA, total, None))
+
+    produtor = threading.Thread(target=_produtor, name="busca", daemon=True)
+    produtor.start()
+    # Cancelar acorda o consumidor na hora, sem esperar downloads em andamento
+    cancel.ao_cancelar(lambda: saida.put((_CANCELOU, None, None)))
+
+    total: Optional[int] = None
+    recebidos = 0
+    try:
+        while total is None or recebidos < total:
+            i, site, fut = saida.get()
+            if i is _CANCELOU or cancel.cancelado:
+                break
+            if i is _FIM_BUSCA:
+                total = site
+                if ao_fim_busca is not None:
+                    ao_fim_busca(total)
+                continue
+            recebidos += 1
+            vagas.release()
+            try:
+                resp, extra = fut.result()
+            except Exception:
+                resp, extra = None, None
+            yield i, site, resp, extra
+            if cancel.cancelado:
+                break
+        if falhas and not cancel.cancelado:
+            raise falhas[0]
+    finally:
+        parar.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# -------------------------------------------
+# Crawler de páginas de contato (por domínio)
+# -------------------------------------------
+
+def _sem_acentos(texto: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", texto or "") if not unicodedata.combining(c))
+
+
+def _host_base(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _pontuar_contato(caminho: str, rotulo: str = "") -> int:
+    """Quão "página de contato" parece um link (0 = não parece)."""
+    caminho = _sem_acentos(unquote(caminho or "")).lower()
+    texto = _sem_acentos(rotulo).lower()
+    pontos = 0
+    for peso, palavra in PALAVRAS_CONTATO:
+        if palavra in caminho:
+            pontos = max(pontos, peso + 1)
+        if texto and palavra in texto:
+            pontos = max(pontos, peso)
+    return pontos
+
+
+def links_contato(pagina: Dict[str, Any], base_url: str) -> List[str]:
+    """
+    Links do mesmo domínio que parecem páginas de contato (pelo caminho ou
+    pelo texto do link), mais promissores primeiro.
+    """
+    host = _host_base(base_url)
+    base_norm = normalizar_url(base_url)
+    pontuados: Dict[str, Tuple[int, int, str]] = {}
+    for ordem, (href, rotulo) in enumerate(pagina.get("ancoras", [])):
+        href = (href or "").strip()
+        if not href or href.startswith("#"):
+            continue
+        url = urljoin(base_url, href)
+        p = urlparse(url)
+        if p.scheme not in ("http", "https") or _host_base(url) != host:
+            continue
+        pontos = _pontuar_contato(p.path, rotulo)
+        if not pontos:
+            continue
+        url = urlunparse(p._replace(fragment=""))
+        chave = normalizar_url(url)
+        if chave == base_norm:
+            continue
+        atual = pontuados.get(chave)
+        if atual is None:
+            pontuados[chave] = (pontos, ordem, url)
+        elif pontos > atual[0]:
+            pontuados[chave] = (pontos, atual[1], atual[2])
+    ordenados = sorted(pontuados.values(), key=lambda t: (-t[0], t[1]))
+    return [url for _, _, url in ordenados]
+
+
+_INFO_HOSTS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_INFO_HOSTS_LOCK = threading.Lock()
+_RE_LOC = re.compile(r"<loc>\s*(.*?)\s*</loc>", re.IGNORECASE | re.DOTALL)
+
+
+def _ler_robots(raiz: str, cancel: Cancelamento) -> Tuple[Optional[RobotFileParser], List[str]]:
+    """robots.txt do host (regras + sitemaps declarados). Erro de rede = sem restrições."""
+    try:
+        resp = http_get_cache(f"{raiz}/robots.txt", tipos=("text/plain",), cancel=cancel)
+    except Exception:
+        return None, []
+    from urllib.robotparser import RobotFileParser  # puxa urllib.request: só quando usado
+    rp = RobotFileParser()
+    if resp.status_code in (401, 403):
+        rp.disallow_all = True
+        return rp, []
+    if resp.status_code != 200:
+        return None, []
+    rp.parse(resp.text.splitlines())
+    return rp, list(rp.site_maps() or [])
+
+
+def _locs_sitemap(url: str, cancel: Cancelamento) -> Tuple[List[str], bool]:
+    """URLs (<loc>) de um sitemap e se ele é um índice de sitemaps."""
+    try:
+        resp = http_get_cache(url, tipos=TIPOS_SITEMAP, cancel=cancel)
+    except Exception:
+        return [], False
+    if resp.status_code != 200:
+        return [], False
+    corpo = resp.content or b""
+    if corpo[:2] == b"\x1f\x8b":
+        # Lê só até o orçamento: um .xml.gz pequeno pode inflar para gigabytes
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(corpo)) as arq:
+                corpo = arq.read(MAX_BYTES_PAGINA)
+        except Exception:
+            return [], False
+    texto = corpo.decode("utf-8", errors="replace")
+    locs = [unescape(u) for u in _RE_LOC.findall(texto)]
+    return locs, "<sitemapindex" in texto[:2048].lower()
+
+
+def _contatos_sitemap(raiz: str, sitemaps: List[str], cancel: Cancelamento) -> List[str]:
+    """Páginas de contato listadas nos sitemaps do host (segue índices até SITEMAP_MAX_ARQUIVOS)."""
+    pendentes = list(sitemaps) or [f"{raiz}/sitemap.xml"]
+    vistos: set = set()
+    encontrados: List[Tuple[int, int, str]] = []
+    while pendentes and len(vistos) < SITEMAP_MAX_ARQUIVOS and not cancel.cancelado:
+        url = pendentes.pop(0)
+        if url in vistos:
+            continue
+        vistos.add(url)
+        locs, indice = _locs_sitemap(url, cancel)
+        if indice:
+            # Sub-sitemaps de páginas/institucionais primeiro (posts/produtos raramente têm contato)
+            pendentes.extend(sorted(locs, key=lambda u: 0 if re.search(r"page|pagina|institucional", u, re.I) else 1))
+            continue
+        for ordem, loc in enumerate(locs):
+            pontos = _pontuar_contato(urlparse(loc).path)
+            if pontos:
+                encontrados.append((pontos, ordem, loc))
+    encontrados.sort(key=lambda t: (-t[0], t[1]))
+    return [loc for _, _, loc in encontrados]
+
+
+def info_host(url: str, cancel: Optional[Cancelamento] = None) -> Dict[str, Any]:
+    """
+    robots.txt e páginas de contato do sitemap de um host, buscados uma vez
+    por host (os arquivos também ficam no cache de páginas em disco).
+    Se a busca for cancelada no meio, o host não fica marcado como pronto.
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    p = urlparse(url)
+    raiz = f"{p.scheme}://{p.netloc}".lower()
+    with _INFO_HOSTS_LOCK:
+        info = _INFO_HOSTS.get(raiz)
+        if info is None:
+            info = {"lock": threading.Lock(), "pronto": False, "robots": None, "contato": []}
+            _INFO_HOSTS[raiz] = info
+            while len(_INFO_HOSTS) > MAX_HOSTS_MEMORIA:
+                _INFO_HOSTS.popitem(last=False)
+        else:
+            _INFO_HOSTS.move_to_end(raiz)
+    with info["lock"]:
+        if not info["pronto"]:
+            robots, sitemaps = (None, [])
+            if CRAWLER_RESPEITAR_ROBOTS or CRAWLER_USAR_SITEMAP:
+                robots, sitemaps = _ler_robots(raiz, cancel)
+            info["robots"] = robots
+            if CRAWLER_USAR_SITEMAP:
+                info["contato"] = [u for u in _contatos_sitemap(raiz, sitemaps, cancel)
+                                   if _host_base(u) == _host_base(raiz)]
+            info["pronto"] = not cancel.cancelado
+    return info
+
+
+def permitido_robots(url: str, cancel: Optional[Cancelamento] = None) -> bool:
+    if not CRAWLER_RESPEITAR_ROBOTS:
+        return True
+    robots = info_host(url, cancel).get("robots")
+    if robots is None:
+        return True
+    try:
+        return robots.can_fetch(_headers()['User-Agent'], url)
+    except Exception:
+        return True
+
+
+def _mesclar_registro(destino: Dict[str, List[str]], origem: Dict[str, List[str]]):
+    for campo in ("emails", "telefones", "enderecos", "outros_sites", "redes_sociais"):
+        destino[campo] = _uniq(list(destino.get(campo, [])) + list(origem.get(campo, [])))
+
+
+def _baixar_e_extrair(url: str, extrair, cancel: Cancelamento) -> Optional[Dict[str, List[str]]]:
+    if cancel.cancelado:
+        return None
+    resp = _baixar_site(url, MAX_DOWNLOADS_POR_HOST, cancel)
+    if resp is None or resp.status_code != 200 or cancel.cancelado:
+        return None
+    return extrair(resp, resp.url or url)
+
+
+def rastrear_contatos(site: str, registro: Dict[str, List[str]], extrair,
+                      cancel: Optional[Cancelamento] = None) -> Dict[str, List[str]]:
+    """
+    A partir do registro da página inicial (com "links_contato"), visita em
+    largura as páginas de contato do mesmo domínio até CRAWLER_PROFUNDIDADE
+    níveis e CRAWLER_MAX_PAGINAS páginas, baixando cada nível em paralelo
+    (dentro do limite global de downloads de http_get_pagina).
+    Páginas de contato do sitemap entram na frente da fronteira e URLs
+    bloqueadas pelo robots.txt são puladas. A fronteira é deduplicada por
+    URL normalizada e tudo é mesclado no registro do site.
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    visitados = {normalizar_url(site)}
+    fronteira = list(registro.get("links_contato", []))
+    if CRAWLER_USAR_SITEMAP or CRAWLER_RESPEITAR_ROBOTS:
+        fronteira = list(info_host(site, cancel).get("contato", [])) + fronteira
+    paginas = 0
+    for _nivel in range(max(0, CRAWLER_PROFUNDIDADE)):
+        lote: List[str] = []
+        for url in fronteira:
+            if paginas + len(lote) >= CRAWLER_MAX_PAGINAS:
+                break
+            chave = normalizar_url(url)
+            if chave in visitados:
+                continue
+            visitados.add(chave)
+            if not permitido_robots(url, cancel):
+                continue
+            lote.append(url)
+        if not lote or cancel.cancelado:
+            break
+        paginas += len(lote)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(lote), MAX_DOWNLOADS_POR_HOST)),
+                                thread_name_prefix="crawler") as pool:
+            subregistros = list(pool.map(lambda u: _baixar_e_extrair(u, extrair, cancel), lote))
+        fronteira = []
+        for sub in subregistros:
+            if sub:
+                _mesclar_registro(registro, sub)
+                fronteira.extend(sub.get("links_contato", []))
+    return registro
+
+
+def _pos_download_site(extrair, cancel: Cancelamento):
+    """
+    pos_download do pipeline: extrai a página inicial (em thread ou processo,
+    conforme `extrair`) e, com o crawler ativo, agrega as páginas de contato.
+    """
+    def _pos(site: str, resp):
+        if resp is None or resp.status_code != 200 or cancel.cancelado:
+            return None
+        base = resp.url or site
+        registro = extrair(resp, base if CRAWLER_ATIVO else None)
+        if registro is None:
+            return None
+        if CRAWLER_ATIVO:
+            registro = rastrear_contatos(base, registro, extrair, cancel)
+        registro.pop("links_contato", None)
+        return registro
+    return _pos
+
+# -------------------------------------------
+# UI helpers (links clicáveis, render, etc.)
+# -------------------------------------------
+
+# Um único conjunto de tags para todos os links do painel: o alvo de cada
+# link fica em _LINKS_PAINEL, indexado pelo início do trecho no widget.
+TAG_LINK = "link"
+_LINKS_PAINEL: Dict[str, str] = {}
+
+
+def _link_sob_cursor(widget: tk.Text, event) -> Optional[str]:
+    idx = widget.index(f"@{event.x},{event.y}")
+    faixa = widget.tag_prevrange(TAG_LINK, f"{idx}+1c")
+    if not faixa or not widget.compare(faixa[1], ">", idx):
+        return None
+    return _LINKS_PAINEL.get(str(faixa[0]))
+
+
+def configurar_links(widget: tk.Text):
+    """Configura (uma vez) a tag compartilhada de links e seus eventos."""
+    widget.tag_config(TAG_LINK, foreground="blue", underline=True)
+
+    def _open(event):
+        link = _link_sob_cursor(widget, event)
+        if not link:
+            return
+        try:
+            webbrowser.open_new(link)
+        except Exception:
+            pass
+
+    def _enter(_e=None):
+        widget.config(cursor="hand2")
+
+    def _leave(_e=None):
+        widget.config(cursor="arrow")
+
+    widget.tag_bind(TAG_LINK, "<Button-1>", _open)
+    widget.tag_bind(TAG_LINK, "<Enter>", _enter)
+    widget.tag_bind(TAG_LINK, "<Leave>", _leave)
+
+
+def _limpar_painel(widget: tk.Text):
+    """Apaga o texto, o índice de links e tags antigas (link_*) de versões anteriores."""
+    widget.delete(1.0, tk.END)
+    _LINKS_PAINEL.clear()
+    antigas = [t for t in widget.tag_names() if str(t).startswith("link_")]
+    if antigas:
+        widget.tag_delete(*antigas)
+
+
+def _inserir_trechos(widget: tk.Text, trechos: List[Tuple[str, Optional[str]]]):
+    """
+    Insere vários trechos (texto, url|None) numa única chamada ao Tk; trechos
+    com url recebem a tag compartilhada e entram no índice de links.
+    """
+    if not trechos:
+        return
+    inicio = widget.index("end-1c")
+    args: List[Any] = []
+    urls: List[str] = []
+    for texto, url in trechos:
+        if url:
+            args.extend([texto, (TAG_LINK,)])
+            urls.append(url)
+        else:
+            args.extend([texto, ()])
+    widget.insert(tk.END, *args)
+    pos = inicio
+    for url in urls:
+        faixa = widget.tag_nextrange(TAG_LINK, pos)
+        if not faixa:
+            break
+        _LINKS_PAINEL[str(faixa[0])] = url
+        pos = faixa[1]
+
+
+def _trechos_item(item: Dict[str, Any]) -> List[Tuple[str, Optional[str]]]:
+    """Bloco de um site como lista de trechos (texto, url do link ou None)."""
+    site = item.get("site", "")
+    emails = item.get("emails", [])
+    telefones = item.get("telefones", [])
+    enderecos = item.get("enderecos", [])
+    outros_sites = item.get("outros_sites", [])
+    redes_sociais = item.get("redes_sociais", [])
+    t: List[Tuple[str, Optional[str]]] = []
+
+    t.append(("\n🔗 Site: ", None))
+    if site:
+        t.append((site, site))
+    t.append(("\n", None))
+
+    if emails:
+        t.append(("📧 E-mails encontrados:\n", None))
+        for email in emails:
+            t += [("   - ", None), (email, f"mailto:{email}"), ("\n", None)]
+    else:
+        t.append(("Nenhum e-mail encontrado.\n", None))
+
+    if telefones:
+        t.append(("📞 Telefones encontrados:\n", None))
+        for tel in telefones:
+            t.append(("   - ", None))
+            if isinstance(tel, str) and tel.lower() == "whatsapp":
+                t.append(("WhatsApp\n", None))
+            else:
+                tel_digits = re.sub(r"\D", "", tel)
+                if tel_digits:
+                    t += [(tel, f"tel:{tel_digits}"), ("\n", None)]
+                else:
+                    t.append((f"{tel}\n", None))
+    else:
+        t.append(("Nenhum telefone encontrado.\n", None))
+
+    if enderecos:
+        t.append(("🏠 Endereços encontrados:\n", None))
+        for end in enderecos:
+            t.append((f"   - {end}\n", None))
+    else:
+        t.append(("Nenhum endereço encontrado.\n", None))
+
+    if outros_sites:
+        t.append(("🌐 Outros sites encontrados:\n", None))
+        for s in outros_sites:
+            t += [("   - ", None), (s, s), ("\n", None)]
+    else:
+        t.append(("Nenhum site encontrado.\n", None))
+
+    if redes_sociais:
+        t.append(("🔗 Redes sociais encontradas:\n", None))
+        for r in redes_sociais:
+            t += [("   - ", None), (r, r), ("\n", None)]
+    else:
+        t.append(("Nenhuma rede social encontrada.\n", None))
+    return t
+
+
+def _render_item(widget: tk.Text, item: Dict[str, Any]):
+    """Acrescenta o bloco de um site ao final do widget."""
+    _inserir_trechos(widget, _trechos_item(item))
+
+
+def _total_paginas() -> int:
+    return max(1, (len(SEARCH_RESULTS) + RESULTADOS_POR_PAGINA - 1) // RESULTADOS_POR_PAGINA)
+
+
+def _ui_atualiza_paginacao():
+    total = _total_paginas()
+    if pagina_label is not None:
+        pagina_label.config(text=f"Página {PAGINA_ATUAL + 1}/{total} – {len(SEARCH_RESULTS)} sites")
+    if btn_pagina_anterior is not None:
+        btn_pagina_anterior.config(state="normal" if PAGINA_ATUAL > 0 else "disabled")
+    if btn_pagina_proxima is not None:
+        btn_pagina_proxima.config(state="normal" if PAGINA_ATUAL + 1 < total else "disabled")
+
+
+def mostrar_pagina(pagina: int):
+    """Renderiza só uma página de SEARCH_RESULTS (RESULTADOS_POR_PAGINA sites) num lote."""
+    global PAGINA_ATUAL
+    PAGINA_ATUAL = min(max(0, pagina), _total_paginas() - 1)
+    if resultado_text is None:
+        return
+    try:
+        _limpar_painel(resultado_text)
+        inicio = PAGINA_ATUAL * RESULTADOS_POR_PAGINA
+        trechos: List[Tuple[str, Optional[str]]] = [("=== Resultados ===\n", None)]
+        for item in SEARCH_RESULTS[inicio:inicio + RESULTADOS_POR_PAGINA]:
+            trechos.extend(_trechos_item(item))
+        _inserir_trechos(resultado_text, trechos)
+    except Exception as e:
+        print(f"Erro ao renderizar resultados: {e}", file=sys.stderr)
+    _ui_atualiza_paginacao()
+
+
+def render_results(results: List[Dict[str, Any]]):
+    """Mostra resultados com links clicáveis (urls, e-mails, telefones)."""
+    global SEARCH_RESULTS
+    if resultado_text is None:
+        return
+    if not results:
+        _limpar_painel(resultado_text)
+        resultado_text.insert(tk.END, "=== Resultados ===\n")
+        resultado_text.insert(tk.END, "\nNenhum site foi encontrado para a consulta.\n")
+        return
+    SEARCH_RESULTS = results
+    mostrar_pagina(0)
+
+
+def _ui_inicia_resultados():
+    """Limpa o painel para uma nova busca (os sites entram um a um depois)."""
+    global SEARCH_RESULTS, PAGINA_ATUAL
+    SEARCH_RESULTS = []
+    PAGINA_ATUAL = 0
+    if resultado_text is not None:
+        _limpar_painel(resultado_text)
+        resultado_text.insert(tk.END, "=== Resultados ===\n")
+    _ui_atualiza_paginacao()
+
+
+def _ui_adiciona_resultado(item: Dict[str, Any]):
+    """Mostra um site assim que ele termina (chamado na thread da UI)."""
+    SEARCH_RESULTS.append(item)
+    # Só desenha se o site cair na página que está à mostra
+    if resultado_text is not None and (len(SEARCH_RESULTS) - 1) // RESULTADOS_POR_PAGINA == PAGINA_ATUAL:
+        try:
+            _render_item(resultado_text, item)
+        except Exception as e:
+            print(f"Erro ao renderizar resultado: {e}", file=sys.stderr)
+    _ui_atualiza_paginacao()
+
+# -------------------------------------------
+# UF / Município
+# -------------------------------------------
+
+def carregar_estados():
+    if estado_combo is None or cidade_combo is None:
+        return
+    ufs_legiveis = [f"{sigla} - {nome}" for sigla, nome in UFS]
+    estado_combo["values"] = ufs_legiveis
+    estado_combo.set("")
+    cidade_combo.set("")
+    cidade_combo["values"] = []
+
+
+def _caminho_indice_embutido() -> str:
+    """Índice que acompanha o programa (ao lado do main.py; no executável, dentro dele)."""
+    pasta = getattr(sys, "_MEIPASS", None) or os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(pasta, ARQUIVO_MUNICIPIOS)
+
+
+def _caminhos_indice_municipios() -> List[str]:
+    """Índice salvo em DIR_DADOS e, como reserva, o arquivo embutido no programa."""
+    return [os.path.join(DIR_DADOS, ARQUIVO_MUNICIPIOS), _caminho_indice_embutido()]
+
+
+def _ler_indice_municipios(caminho: str) -> Tuple[Optional[Dict[str, List[str]]], float]:
+    try:
+        with gzip.open(caminho, "rt", encoding="utf-8") as f:
+            dados = json.load(f)
+        return dados["ufs"], float(dados.get("atualizado_em", 0))
+    except FileNotFoundError:
+        return None, 0.0
+    except Exception as e:
+        print(f"Índice de municípios ilegível ({caminho}): {e}", file=sys.stderr)
+        return None, 0.0
+
+
+def _gravar_indice_municipios(ufs: Dict[str, List[str]], caminho: Optional[str] = None):
+    """Grava o índice (JSON gzip) trocando o arquivo de uma vez, sem deixar arquivo pela metade."""
+    caminho = caminho or os.path.join(DIR_DADOS, ARQUIVO_MUNICIPIOS)
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temp = f"{caminho}.{os.getpid()}.tmp"
+    with gzip.open(temp, "wt", encoding="utf-8") as f:
+        json.dump({"atualizado_em": time.time(), "ufs": ufs}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp, caminho)
+
+
+def baixar_municipios_ibge() -> Optional[Dict[str, List[str]]]:
+    """Todos os municípios do Brasil numa única requisição ao IBGE, agrupados por UF."""
+    try:
+        resp = http_get(URL_MUNICIPIOS)
+        if resp.status_code != 200:
+            return None
+        ufs: Dict[str, List[str]] = {}
+        for item in resp.json():
+            nome, sigla = item.get("municipio-nome"), item.get("UF-sigla")
+            if nome and sigla:
+                ufs.setdefault(sigla, []).append(nome)
+        return {sigla: sorted(nomes) for sigla, nomes in ufs.items()} or None
+    except Exception as e:
+        print(f"Erro ao buscar municípios do IBGE: {e}", file=sys.stderr)
+        return None
+
+
+_MUNICIPIOS_LOCK = threading.Lock()
+_MUNICIPIOS_FALHA_EM = 0.0
+
+
+def carregar_indice_municipios(atualizar: bool = False) -> bool:
+    """
+    Preenche MUNICIPIOS_CACHE com as 27 UFs: índice salvo > arquivo embutido.
+    Se não houver índice, ele tiver mais de MUNICIPIOS_TTL ou `atualizar`,
+    baixa tudo do IBGE de uma vez e salva. Sem rede, fica com o que tiver
+    (nova tentativa só depois de alguns minutos). Retorna se há índice.
+    """
+    global _MUNICIPIOS_FALHA_EM
+    with _MUNICIPIOS_LOCK:
+        idade = None
+        for caminho in _caminhos_indice_municipios():
+            ufs, atualizado_em = _ler_indice_municipios(caminho)
+            if ufs:
+                MUNICIPIOS_CACHE.update(ufs)
+                idade = time.time() - atualizado_em
+                break
+        if not atualizar and idade is not None and idade < MUNICIPIOS_TTL:
+            return True
+        if not atualizar and time.time() - _MUNICIPIOS_FALHA_EM < 300:
+            return idade is not None
+        ufs = baixar_municipios_ibge()
+        if not ufs:
+            _MUNICIPIOS_FALHA_EM = time.time()
+            return idade is not None and not atualizar
+        MUNICIPIOS_CACHE.update(ufs)
+        try:
+            _gravar_indice_municipios(ufs)
+        except Exception as e:
+            print(f"Não foi possível salvar o índice de municípios: {e}", file=sys.stderr)
+        return True
+
+
+def municipios_uf(sigla: str) -> List[str]:
+    """
+    Municípios da UF: MUNICIPIOS_CACHE, depois o índice (carregado/atualizado
+    de uma vez para todas as UFs) e, em último caso, a consulta da UF no IBGE.
+    Lista vazia se nada disso funcionar.
+    """
+    sigla = sigla.strip().upper()
+    if sigla in MUNICIPIOS_CACHE:
+        return MUNICIPIOS_CACHE[sigla]
+    carregar_indice_municipios()
+    if sigla in MUNICIPIOS_CACHE:
+        return MUNICIPIOS_CACHE[sigla]
+    try:
+        url = f"https://servicodados.ibge.gov.br/api/v1/localidades/estados/{sigla}/municipios"
+        resp = http_get(url)
+        if resp.status_code != 200:
+            return []
+        dados = resp.json()
+        cidades = sorted([item.get("nome", "") for item in dados if item.get("nome")])
+        MUNICIPIOS_CACHE[sigla] = cidades
+        return cidades
+    except Exception as e:
+        print(f"Erro ao buscar municípios do IBGE ({sigla}): {e}", file=sys.stderr)
+        return []
+
+
+def _chave_cidade(texto: str) -> str:
+    """Forma de comparação de nomes: sem acento, minúsculas, pontuação vira espaço."""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", _sem_acentos(texto).lower()).split())
+
+
+class IndiceCidades:
+    """
+    Índice em memória dos municípios para autocompletar e resolver texto livre.
+    Guarda, por UF e para o país todo, listas ordenadas de (chave, posição)
+    com uma chave para o nome inteiro e uma para cada palavra seguinte
+    ("horizonte" acha "Belo Horizonte"); a busca por prefixo é um bisect.
+    """
+
+    def __init__(self, municipios: Dict[str, List[str]]):
+        self.cidades: List[Tuple[str, str]] = []
+        self._chaves: Dict[Tuple[str, str], str] = {}
+        self._por_chave: Dict[str, List[int]] = {}
+        entradas: Dict[str, List[Tuple[str, int]]] = {"": []}
+        for uf in sorted(municipios):
+            for nome in municipios[uf]:
+                pos = len(self.cidades)
+                self.cidades.append((nome, uf))
+                chave = _chave_cidade(nome)
+                self._chaves[(nome, uf)] = chave
+                self._por_chave.setdefault(chave, []).append(pos)
+                palavras = chave.split()
+                for i in range(len(palavras)):
+                    sufixo = " ".join(palavras[i:])
+                    entradas[""].append((sufixo, pos))
+                    entradas.setdefault(uf, []).append((sufixo, pos))
+        self._ordenadas = {uf: sorted(lista) for uf, lista in entradas.items()}
+
+    def prefixo(self, texto: str, uf: str = "", limite: int = 50) -> List[Tuple[str, str]]:
+        """(nome, UF) cujo nome (ou uma palavra dele em diante) começa com `texto`."""
+        lista = self._ordenadas.get(uf.upper(), [])
+        chave = _chave_cidade(texto)
+        i = bisect.bisect_left(lista, (chave, -1))
+        vistos: Dict[int, None] = {}
+        while i < len(lista) and lista[i][0].startswith(chave) and len(vistos) < limite:
+            vistos.setdefault(lista[i][1])
+            i += 1
+        # Quem começa pelo próprio nome vem antes de quem só casa numa palavra do meio
+        ordem = sorted(vistos, key=lambda p: (not self._chaves[self.cidades[p]].startswith(chave),
+                                             self._chaves[self.cidades[p]]))
+        return [self.cidades[p] for p in ordem]
+
+    def candidatos(self, texto: str, uf: str = "", aproximado: bool = True) -> List[Tuple[str, str]]:
+        """Municípios com esse nome exato (sem acento/caixa); se não houver, os mais parecidos."""
+        chave = _chave_cidade(texto)
+        uf = uf.upper()
+        achados = [self.cidades[p] for p in self._por_chave.get(chave, [])
+                   if not uf or self.cidades[p][1] == uf]
+        if achados or not aproximado or not chave:
+            return achados
+        universo = [k for k in self._por_chave
+                    if not uf or any(self.cidades[p][1] == uf for p in self._por_chave[k])]
+        parecidos = difflib.get_close_matches(chave, universo, n=3, cutoff=0.85)
+        return [self.cidades[p] for k in parecidos for p in self._por_chave[k]
+                if not uf or self.cidades[p][1] == uf]
+
+    def resolver(self, texto: str, uf: str = "", aproximado: bool = True) -> Optional[Tuple[str, str]]:
+        """
+        Texto livre ("campinas", "Sao Jose dos Campos/SP", "Bom Jesus - PI")
+        para o par canônico (nome, UF). None se não achar ou se o nome existir
+        em mais de uma UF sem indicação de qual.
+        """
+        texto = (texto or "").strip()
+        m = re.match(r"^(.*?)[\s,/()\-]+([A-Za-z]{2})\)?$", texto)
+        siglas = {s for s, _ in UFS}
+        if not uf and m and m.group(2).upper() in siglas and m.group(1).strip():
+            texto, uf = m.group(1), m.group(2)
+        achados = self.candidatos(texto, uf, aproximado)
+        return achados[0] if len(achados) == 1 else None
+
+
+_INDICE_CIDADES: Optional[IndiceCidades] = None
+_INDICE_CIDADES_VERSAO: Tuple = ()
+_INDICE_CIDADES_LOCK = threading.Lock()
+
+
+def indice_cidades() -> IndiceCidades:
+    """Índice de MUNICIPIOS_CACHE, refeito quando o cache muda (ex.: após atualizar o IBGE)."""
+    global _INDICE_CIDADES, _INDICE_CIDADES_VERSAO
+    versao = tuple((uf, id(c), len(c)) for uf, c in MUNICIPIOS_CACHE.items())
+    with _INDICE_CIDADES_LOCK:
+        if _INDICE_CIDADES is None or versao != _INDICE_CIDADES_VERSAO:
+            _INDICE_CIDADES = IndiceCidades(dict(MUNICIPIOS_CACHE))
+            _INDICE_CIDADES_VERSAO = versao
+        return _INDICE_CIDADES
+
+
+def resolver_cidade(texto: str, uf: str = "", aproximado: bool = True) -> Optional[Tuple[str, str]]:
+    """(nome, UF) canônicos de um município digitado livremente (carrega o índice se preciso)."""
+    if not MUNICIPIOS_CACHE:
+        carregar_indice_municipios()
+    if uf and uf.upper() not in MUNICIPIOS_CACHE:
+        municipios_uf(uf)
+    return indice_cidades().resolver(texto, uf, aproximado)
+
+
+def _preparar_municipios():
+    """Início da janela: carrega o índice de municípios e já monta o de autocompletar."""
+    if carregar_indice_municipios():
+        indice_cidades()
+
+
+def on_estado_selecionado(event=None):
+    if estado_combo is None or cidade_combo is None:
+        return
+    valor = estado_combo.get().strip()
+    if not valor:
+        cidade_combo["values"] = []
+        cidade_combo.set("")
+        return
+    sigla = valor.split(" - ")[0]
+    cidade_combo.set("")
+    if sigla in MUNICIPIOS_CACHE:
+        cidade_combo["values"] = MUNICIPIOS_CACHE[sigla]
+        return
+    # Índice ainda não carregado (primeira execução): busca fora da thread da UI;
+    # enquanto isso a cidade pode ser digitada livremente
+    cidade_combo["values"] = []
+    if status_label is not None:
+        status_label.config(text=f"Carregando municípios de {sigla}…")
+
+    def _aplicar(cidades: List[str]):
+        if estado_combo is not None and cidade_combo is not None \
+                and estado_combo.get().strip().split(" - ")[0] == sigla:
+            cidade_combo["values"] = cidades
+        if status_label is not None and status_label.cget("text").startswith("Carregando municípios"):
+            status_label.config(text="Pronto")
+
+    def _carregar():
+        cidades = municipios_uf(sigla)
+        if root is not None:
+            root.after(0, _aplicar, cidades)
+
+    threading.Thread(target=_carregar, name="municipios", daemon=True).start()
+
+
+def on_cidade_digitada(event=None):
+    """Filtra as sugestões do combo de cidade pelo que já foi digitado (prefixo, sem acento)."""
+    if estado_combo is None or cidade_combo is None:
+        return
+    if event is not None and getattr(event, "keysym", "") in ("Up", "Down", "Return", "Escape", "Tab"):
+        return
+    sigla = estado_combo.get().strip().split(" - ")[0]
+    texto = cidade_combo.get()
+    if sigla and sigla not in MUNICIPIOS_CACHE:
+        return
+    if not texto.strip():
+        cidade_combo["values"] = MUNICIPIOS_CACHE.get(sigla, [])
+        return
+    achados = indice_cidades().prefixo(texto, sigla, limite=SUGESTOES_CIDADE)
+    # Sem UF escolhida, as sugestões vêm do país todo com a UF junto
+    cidade_combo["values"] = [nome if sigla else f"{nome} - {uf}" for nome, uf in achados]
+
+
+def on_cidade_selecionada(event=None):
+    """Sugestão "Cidade - UF" escolhida sem UF: preenche o estado e deixa só o nome na cidade."""
+    if estado_combo is None or cidade_combo is None or estado_combo.get().strip():
+        return
+    par = indice_cidades().resolver(cidade_combo.get())
+    if par is None:
+        return
+    nome, uf = par
+    estado_combo.set(next((f"{s} - {n}" for s, n in UFS if s == uf), uf))
+    cidade_combo["values"] = MUNICIPIOS_CACHE.get(uf, [])
+    cidade_combo.set(nome)
+
+
+def get_localidade_text():
+    if estado_combo is None or cidade_combo is None:
+        return ""
+    uf = estado_combo.get().strip()
+    cidade = cidade_combo.get().strip()
+    sigla = uf.split(" - ")[0] if (" - " in uf) else uf
+    if cidade and sigla:
+        return f"{cidade} - {sigla}"
+    if sigla:
+        return sigla
+    return cidade
+
+# -------------------------------------------
+# Progresso (UI)
+# -------------------------------------------
+
+def _ui_begin_indeterminado():
+    if status_label is not None:
+        status_label.config(text="Procurando…")
+    if progress is not None:
+        progress.configure(mode="indeterminate")
+        progress.start(12)
+    if btn_buscar is not None:
+        btn_buscar.config(state="disabled")
+    if btn_limpar is not None:
+        btn_limpar.config(state="disabled")
+    if btn_planilha is not None:
+        btn_planilha.config(state="disabled")
+    if btn_cancelar is not None:
+        btn_cancelar.config(state="normal")
+
+
+def _ui_begin_determinado(total: int):
+    if status_label is not None:
+        status_label.config(text="Procurando (0/{} – 0%)…".format(total))
+    if progress is not None:
+        progress.configure(mode="determinate", maximum=total)
+        progress['value'] = 0
+    if btn_buscar is not None:
+        btn_buscar.config(state="disabled")
+    if btn_limpar is not None:
+        btn_limpar.config(state="disabled")
+    if btn_planilha is not None:
+        btn_planilha.config(state="disabled")
+    if btn_cancelar is not None:
+        btn_cancelar.config(state="normal")
+    _ui_agenda_progresso()
+
+
+def _ui_step(atual: int, total: int, dominio: str = "",
+             paginas_s: Optional[float] = None, eta_s: Optional[float] = None):
+    if progress is not None:
+        progress.configure(maximum=max(total, 1))
+        progress['value'] = atual
+    pct = int((atual / total) * 100) if total else 0
+    label_dom = f" – {dominio}" if dominio else ""
+    extra = ""
+    if paginas_s is not None:
+        extra += f" – {paginas_s:.1f} pág/s"
+    if eta_s is not None:
+        extra += f" – ~{int(eta_s) + 1}s restantes"
+    if status_label is not None:
+        status_label.config(text=f"Procurando ({atual}/{total} – {pct}%){label_dom}{extra}")
+
+
+def _ui_drena_resultados():
+    """Leva ao painel os sites concluídos desde o último quadro."""
+    while _RESULTADOS_PENDENTES:
+        _ui_adiciona_resultado(_RESULTADOS_PENDENTES.popleft())
+
+
+def _ui_poll_progresso():
+    """Um quadro: lê os contadores das threads e atualiza barra, rótulo e painel."""
+    global _POLL_PROGRESSO
+    _POLL_PROGRESSO = None
+    _ui_drena_resultados()
+    with _PROGRESSO_LOCK:
+        atual, total, dominio = PASSOS_CONCLUIDOS, TOTAL_PASSOS, DOMINIO_ATUAL
+        paginas, inicio = PAGINAS_BAIXADAS, INICIO_BUSCA
+    decorrido = max(time.time() - inicio, 1e-6)
+    eta = (total - atual) * decorrido / atual if atual and total > atual else None
+    _ui_step(atual, total, dominio, paginas / decorrido, eta)
+    if root is not None:
+        _POLL_PROGRESSO = root.after(INTERVALO_PROGRESSO_MS, _ui_poll_progresso)
+
+
+def _ui_agenda_progresso():
+    global _POLL_PROGRESSO
+    _ui_para_progresso()
+    if root is not None:
+        _POLL_PROGRESSO = root.after(INTERVALO_PROGRESSO_MS, _ui_poll_progresso)
+
+
+def _ui_para_progresso():
+    global _POLL_PROGRESSO
+    if _POLL_PROGRESSO is not None and root is not None:
+        try:
+            root.after_cancel(_POLL_PROGRESSO)
+        except Exception:
+            pass
+    _POLL_PROGRESSO = None
+
+
+def _ui_end(cancelado: bool = False, erro: Optional[str] = None):
+    _ui_para_progresso()
+    try:
+        if progress is not None:
+            progress.stop()
+    except Exception:
+        pass
+    if btn_buscar is not None:
+        btn_buscar.config(state="normal")
+    if btn_limpar is not None:
+        btn_limpar.config(state="normal")
+    if btn_planilha is not None:
+        btn_planilha.config(state="normal")
+    if btn_cancelar is not None:
+        btn_cancelar.config(state="disabled")
+    if status_label is not None:
+        status_label.config(text=erro or ("Cancelado" if cancelado else "Concluído!"))
+
+
+def cancelar_busca():
+    """Cancela a busca em andamento: downloads abertos são abortados e a UI volta na hora."""
+    if CANCELAMENTO is not None:
+        CANCELAMENTO.cancelar()
+
+# -------------------------------------------
+# Gravação incremental de resultados (sobrevive a quedas)
+# -------------------------------------------
+
+class SinkResultados:
+    """
+    Arquivo JSON Lines só de acréscimo: cada site é gravado assim que extraído
+    (flush imediato; fsync no máximo SINK_FSYNC_S segundos depois, mesmo que
+    não venham mais gravações, e ao fechar). Uma
+    linha cortada por queda é descartada ao reabrir. Os itens levam a
+    "consulta" e os "campos" extraídos, para retomar uma busca pulando as
+    URLs já gravadas com os mesmos campos. Itens de varredura levam também a
+    "varredura" (as UFs), para não se misturarem com a busca simples do mesmo
+    termo. concluir() grava uma linha de fim: busca concluída não é retomada.
+    Sem `anexar`, o arquivo começa vazio.
+    """
+
+    def __init__(self, caminho: str, anexar: bool = True):
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        if anexar:
+            self._reparar()
+        self._arq = open(caminho, "a" if anexar else "w", encoding="utf-8")
+        self._ultimo_fsync = time.time()
+        # fsync adiado das gravações desde o último (None = nada pendente)
+        self._timer: Optional[threading.Timer] = None
+
+    def _reparar(self):
+        """Corta uma última linha incompleta (queda no meio de uma gravação)."""
+        try:
+            with open(self.caminho, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                tamanho = f.tell()
+                if tamanho == 0:
+                    return
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) == b"\n":
+                    return
+                pos = tamanho
+                while pos > 0:
+                    passo = min(64 * 1024, pos)
+                    pos -= passo
+                    f.seek(pos)
+                    bloco = f.read(passo)
+                    fim = bloco.rfind(b"\n")
+                    if fim >= 0:
+                        f.truncate(pos + fim + 1)
+                        return
+                f.truncate(0)
+        except FileNotFoundError:
+            pass
+
+    def _linhas(self, consulta: Optional[str], campos: Optional[str],
+                varredura: str) -> Iterable[Dict[str, Any]]:
+        with self._lock:
+            self._arq.flush()
+        with open(self.caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    item = json.loads(linha)
+                except ValueError:
+                    continue
+                if consulta is not None and (item.get("consulta") != consulta
+                                             or item.get("varredura", "") != varredura):
+                    continue
+                if campos is not None and item.get("campos") != campos:
+                    continue
+                yield item
+
+    def itens(self, consulta: Optional[str] = None, campos: Optional[str] = None,
+              varredura: str = "") -> Iterable[Dict[str, Any]]:
+        """Itens gravados (todos ou só os da consulta/campos), na ordem de gravação."""
+        return (i for i in self._linhas(consulta, campos, varredura) if not i.get("concluida"))
+
+    def urls(self, consulta: Optional[str] = None, campos: Optional[str] = None,
+             varredura: str = "") -> set:
+        """URLs normalizadas já gravadas (para pular ao retomar)."""
+        return {normalizar_url(item["site"]) for item in self.itens(consulta, campos, varredura)
+                if item.get("site")}
+
+    def concluir(self, consulta: str, campos: str):
+        """Marca a busca como concluída (não é retomada ao repeti-la)."""
+        self.gravar({"consulta": consulta, "campos": campos, "concluida": True})
+
+    def concluida(self, consulta: str, campos: str) -> bool:
+        return any(i.get("concluida") for i in self._linhas(consulta, campos, ""))
+
+    def gravar(self, item: Dict[str, Any]):
+        with self._lock:
+            self._arq.write(json.dumps(item, ensure_ascii=False) + "\n")
+            self._arq.flush()
+            espera = self._ultimo_fsync + SINK_FSYNC_S - time.time()
+            if espera <= 0:
+                self._sincronizar()
+            elif self._timer is None:
+                self._timer = threading.Timer(espera, self._sincronizar_depois)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _sincronizar(self):
+        """Chamado com self._lock."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._arq.closed:
+            os.fsync(self._arq.fileno())
+        self._ultimo_fsync = time.time()
+
+    def _sincronizar_depois(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer = None
+                try:
+                    self._sincronizar()
+                except OSError as e:
+                    print(f"Erro ao sincronizar {self.caminho}: {e}", file=sys.stderr)
+
+    def limpar(self):
+        with self._lock:
+            self._arq.truncate(0)
+            self._arq.flush()
+            self._sincronizar()
+
+    def fechar(self):
+        with self._lock:
+            if self._arq.closed:
+                return
+            self._arq.flush()
+            self._sincronizar()
+            self._arq.close()
+
+
+_SINK_SESSAO: Optional[SinkResultados] = None
+
+
+def _item_do_sink(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in item.items() if k not in ("consulta", "campos", "varredura")}
+
+
+def sink_sessao() -> Optional[SinkResultados]:
+    """Sink da janela (DIR_DADOS/sessao.jsonl): guarda a busca atual até a próxima."""
+    global _SINK_SESSAO
+    if _SINK_SESSAO is None:
+        try:
+            _SINK_SESSAO = SinkResultados(os.path.join(DIR_DADOS, "sessao.jsonl"))
+        except Exception as e:
+            print(f"Gravação da sessão indisponível: {e}", file=sys.stderr)
+    return _SINK_SESSAO
+
+# -------------------------------------------
+# Base de resultados (SQLite indexado, acumula entre execuções)
+# -------------------------------------------
+
+def dominio_site(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalizar_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def normalizar_telefone(telefone: str) -> str:
+    """Só dígitos, sem +55 nem 0 de operadora ("+55 (011) 1234-5678" -> "1112345678")."""
+    digitos = _limpa_tel(telefone)
+    if not digitos:
+        return (telefone or "").strip().lower()
+    if digitos.startswith("55") and len(digitos) >= 12:
+        digitos = digitos[2:]
+    while digitos.startswith("0") and len(digitos) > 10:
+        digitos = digitos[1:]
+    return digitos
+
+
+def _data_base(instante: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(instante))
+
+
+# (coluna do item, tipo gravado na tabela links)
+_LINKS_ITEM = (("outros_sites", "site"), ("redes_sociais", "social"))
+
+
+class BaseResultados:
+    """
+    Todos os sites já extraídos, em SQLite (DIR_DADOS/resultados.sqlite3):
+      - sites: um por URL normalizada (deduplicação entre execuções), com
+        domínio e primeira/última vez em que apareceu;
+      - ocorrencias: em que consulta/município cada site apareceu;
+      - emails, telefones, enderecos, links: contatos acumulados por site.
+    Índices por domínio, e-mail e telefone normalizados, município e data
+    mantêm consultas e deduplicação rápidas com milhões de linhas.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn = conectar_sqlite(caminho)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sites ("
+                " id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, site TEXT NOT NULL,"
+                " dominio TEXT NOT NULL, primeira_vez REAL NOT NULL, ultima_vez REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sites_dominio ON sites (dominio)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sites_ultima_vez ON sites (ultima_vez)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocorrencias ("
+                " site_id INTEGER NOT NULL, consulta TEXT NOT NULL, uf TEXT NOT NULL,"
+                " cidade TEXT NOT NULL, cidade_chave TEXT NOT NULL, visto_em REAL NOT NULL,"
+                " PRIMARY KEY (site_id, consulta, uf, cidade_chave)) WITHOUT ROWID")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ocorrencias_cidade"
+                               " ON ocorrencias (cidade_chave, uf)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ocorrencias_uf ON ocorrencias (uf)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS emails ("
+                " site_id INTEGER NOT NULL, email TEXT NOT NULL, email_norm TEXT NOT NULL,"
+                " PRIMARY KEY (site_id, email_norm)) WITHOUT ROWID")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS emails_norm ON emails (email_norm)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS telefones ("
+                " site_id INTEGER NOT NULL, telefone TEXT NOT NULL, telefone_norm TEXT NOT NULL,"
+                " PRIMARY KEY (site_id, telefone_norm)) WITHOUT ROWID")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS telefones_norm ON telefones (telefone_norm)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS enderecos ("
+                " site_id INTEGER NOT NULL, endereco TEXT NOT NULL,"
+                " PRIMARY KEY (site_id, endereco)) WITHOUT ROWID")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS links ("
+                " site_id INTEGER NOT NULL, tipo TEXT NOT NULL, url TEXT NOT NULL,"
+                " PRIMARY KEY (site_id, tipo, url)) WITHOUT ROWID")
+
+    def _gravar(self, conn: sqlite3.Connection, item: Dict[str, Any], consulta: str,
+                uf: str, cidade: str, agora: float) -> bool:
+        site = item.get("site", "")
+        url = normalizar_url(site)
+        row = conn.execute("SELECT id FROM sites WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            site_id = conn.execute(
+                "INSERT INTO sites (url, site, dominio, primeira_vez, ultima_vez) VALUES (?, ?, ?, ?, ?)",
+                (url, site, dominio_site(site), agora, agora)).lastrowid
+        else:
+            site_id = row[0]
+            conn.execute("UPDATE sites SET ultima_vez = ? WHERE id = ?", (agora, site_id))
+        uf = (item.get("uf") or uf or "").strip().upper()
+        cidade = (item.get("cidade") or cidade or "").strip()
+        conn.execute(
+            "INSERT OR REPLACE INTO ocorrencias (site_id, consulta, uf, cidade, cidade_chave, visto_em)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (site_id, item.get("consulta") or consulta, uf, cidade, _chave_cidade(cidade), agora))
+        # Contatos se acumulam: uma extração com menos campos não apaga os anteriores
+        conn.executemany("INSERT OR IGNORE INTO emails (site_id, email, email_norm) VALUES (?, ?, ?)",
+                         [(site_id, e, normalizar_email(e)) for e in item.get("emails", [])])
+        conn.executemany(
+            "INSERT OR IGNORE INTO telefones (site_id, telefone, telefone_norm) VALUES (?, ?, ?)",
+            [(site_id, t, normalizar_telefone(t)) for t in item.get("telefones", [])])
+        conn.executemany("INSERT OR IGNORE INTO enderecos (site_id, endereco) VALUES (?, ?)",
+                         [(site_id, e) for e in item.get("enderecos", [])])
+        conn.executemany("INSERT OR IGNORE INTO links (site_id, tipo, url) VALUES (?, ?, ?)",
+                         [(site_id, tipo, u) for chave, tipo in _LINKS_ITEM for u in item.get(chave, [])])
+        return row is None
+
+    def gravar(self, item: Dict[str, Any], consulta: str = "", uf: str = "", cidade: str = "") -> bool:
+        """Grava um site (e onde apareceu); True se ele ainda não estava na base."""
+        with self._lock, self._conn:
+            return self._gravar(self._conn, item, consulta, uf, cidade, time.time())
+
+    def ja_visto(self, url: str, dias: Optional[float] = None) -> bool:
+        """True se a URL já está na base (e apareceu nos últimos `dias`, se informado)."""
+        desde = time.time() - dias * 86400 if dias is not None else 0.0
+        with self._lock:
+            row = self._conn.execute("SELECT ultima_vez FROM sites WHERE url = ?",
+                                     (normalizar_url(url),)).fetchone()
+        return row is not None and row[0] >= desde
+
+    def consultar(self, cidade: str = "", uf: str = "", dias: Optional[float] = None,
+                  dominio: str = "", email: str = "", telefone: str = "") -> Iterable[Dict[str, Any]]:
+        """
+        Sites que atendem a todos os filtros informados, do mais recente ao
+        mais antigo, como itens de busca (com "primeira_vez"/"ultima_vez").
+        Lidos em lotes, sem carregar a base inteira na memória.
+        """
+        filtros, params = [], []
+        if cidade or uf:
+            sub, sub_params = [], []
+            if cidade:
+                sub.append("cidade_chave = ?")
+                sub_params.append(_chave_cidade(cidade))
+            if uf:
+                sub.append("uf = ?")
+                sub_params.append(uf.strip().upper())
+            filtros.append(f"s.id IN (SELECT site_id FROM ocorrencias WHERE {' AND '.join(sub)})")
+            params += sub_params
+        if dias is not None:
+            filtros.append("s.ultima_vez >= ?")
+            params.append(time.time() - dias * 86400)
+        if dominio:
+            filtros.append("s.dominio = ?")
+            params.append(dominio_site(dominio if "//" in dominio else f"http://{dominio}"))
+        if email:
+            filtros.append("s.id IN (SELECT site_id FROM emails WHERE email_norm = ?)")
+            params.append(normalizar_email(email))
+        if telefone:
+            filtros.append("s.id IN (SELECT site_id FROM telefones WHERE telefone_norm = ?)")
+            params.append(normalizar_telefone(telefone))
+        sql = "SELECT s.id, s.site, s.primeira_vez, s.ultima_vez FROM sites s"
+        if filtros:
+            sql += " WHERE " + " AND ".join(filtros)
+        cur = self._conn.cursor()
+        with self._lock:
+            cur.execute(sql + " ORDER BY s.ultima_vez DESC", params)
+        while True:
+            with self._lock:
+                rows = cur.fetchmany(500)
+                itens = self._montar_itens(rows)
+            if not itens:
+                break
+            yield from itens
+
+    def _montar_itens(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        itens: Dict[int, Dict[str, Any]] = {}
+        for site_id, site, primeira, ultima in rows:
+            itens[site_id] = {"site": site, "emails": [], "telefones": [], "enderecos": [],
+                              "outros_sites": [], "redes_sociais": [],
+                              "primeira_vez": _data_base(primeira), "ultima_vez": _data_base(ultima)}
+        if not itens:
+            return []
+        marcas = ",".join("?" * len(itens))
+        ids = list(itens)
+        for site_id, email in self._conn.execute(
+                f"SELECT site_id, email FROM emails WHERE site_id IN ({marcas})", ids):
+            itens[site_id]["emails"].append(email)
+        for site_id, tel in self._conn.execute(
+                f"SELECT site_id, telefone FROM telefones WHERE site_id IN ({marcas})", ids):
+            itens[site_id]["telefones"].append(tel)
+        for site_id, endereco in self._conn.execute(
+                f"SELECT site_id, endereco FROM enderecos WHERE site_id IN ({marcas})", ids):
+            itens[site_id]["enderecos"].append(endereco)
+        chaves = {tipo: chave for chave, tipo in _LINKS_ITEM}
+        for site_id, tipo, url in self._conn.execute(
+                f"SELECT site_id, tipo, url FROM links WHERE site_id IN ({marcas})", ids):
+            itens[site_id][chaves[tipo]].append(url)
+        return list(itens.values())
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {tabela: int(self._conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0])
+                    for tabela in ("sites", "ocorrencias", "emails", "telefones", "enderecos", "links")}
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+_BASE_RESULTADOS: Optional[BaseResultados] = None
+_BASE_RESULTADOS_LOCK = threading.Lock()
+
+
+def base_resultados() -> Optional[BaseResultados]:
+    """Base de resultados compartilhada (None se desativada ou indisponível)."""
+    global _BASE_RESULTADOS
+    if not BASE_RESULTADOS_ATIVA:
+        return None
+    with _BASE_RESULTADOS_LOCK:
+        if _BASE_RESULTADOS is None:
+            try:
+                _BASE_RESULTADOS = BaseResultados(os.path.join(DIR_DADOS, "resultados.sqlite3"))
+            except Exception as e:
+                print(f"Base de resultados indisponível: {e}", file=sys.stderr)
+                return None
+        return _BASE_RESULTADOS
+
+
+# -------------------------------------------
+# Thread de busca (com passos granulares)
+# -------------------------------------------
+
+def _calc_passos_por_site(flags: Dict[str, bool]) -> int:
+    # Base: 2 passos (requisição + parse)
+    passos = 2
+    # Cada tipo de extração vira um passo
+    if flags['email']:
+        passos += 1
+    if flags['tel']:
+        passos += 1
+    if flags['endereco']:
+        passos += 1
+    # Varredura de hrefs (sites/redes) é mais um passo se alguma dessas estiver ativa
+    if flags['site'] or flags['social']:
+        passos += 1
+    return passos
+
+
+def _avancar_passo(dominio: str):
+    global PASSOS_CONCLUIDOS, DOMINIO_ATUAL
+    with _PROGRESSO_LOCK:
+        PASSOS_CONCLUIDOS += 1
+        DOMINIO_ATUAL = dominio
+
+
+def _contar_pagina():
+    global PAGINAS_BAIXADAS
+    with _PROGRESSO_LOCK:
+        PAGINAS_BAIXADAS += 1
+
+
+def _item_vazio(site: str) -> Dict[str, Any]:
+    return {
+        "site": site,
+        "emails": [],
+        "telefones": [],
+        "enderecos": [],
+        "outros_sites": [],
+        "redes_sociais": [],
+    }
+
+
+def _processar_site(site: str, resp, flags: Dict[str, bool],
+                    registro: Optional[Dict[str, List[str]]] = None,
+                    cancel: Optional[Cancelamento] = None) -> Optional[Dict[str, Any]]:
+    """
+    Executa os passos de extração de um site já baixado.
+    Se `registro` vier pronto (extraído num processo), só contabiliza os passos.
+    Retorna o item de resultado ou None se a busca foi cancelada no meio.
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    dominio = urlparse(site).netloc or site
+
+    if registro is not None:
+        for _ in range(_calc_passos_por_site(flags)):
+            _avancar_passo(dominio)
+        if cancel.cancelado:
+            return None
+        return {"site": site, **registro}
+
+    # --- Passo 1: requisição (já feita pelo pool de downloads) ---
+    status_ok = resp is not None and resp.status_code == 200
+    _avancar_passo(dominio)
+    if cancel.cancelado:
+        return None
+    if not status_ok:
+        # Registra item vazio e segue
+        return _item_vazio(site)
+
+    # --- Passo 2: parse (uma única varredura da árvore) ---
+    pagina = analisar_html(resp.text)
+    _avancar_passo(dominio)
+    if cancel.cancelado:
+        return None
+
+    # Extra pre-load de json-ld (não conta passo, só otimiza)
+    tel_ld, email_ld, end_ld, redes_ld = _extrai_jsonld(pagina["jsonld"])
+
+    emails, telefones, enderecos, outros_sites, redes_sociais = [], [], [], [], []
+
+    # --- Passo 3: e-mails ---
+    if flags['email']:
+        try:
+            emails = extrair_emails(pagina, email_ld)
+        except Exception:
+            pass
+        _avancar_passo(dominio)
+        if cancel.cancelado:
+            return None
+
+    # --- Passo 4: telefones ---
+    if flags['tel']:
+        try:
+            telefones = extrair_telefones(pagina, tel_ld)
+        except Exception:
+            pass
+        _avancar_passo(dominio)
+        if cancel.cancelado:
+            return None
+
+    # --- Passo 5: endereços ---
+    if flags['endereco']:
+        try:
+            enderecos = extrair_enderecos(pagina, end_ld)
+        except Exception:
+            pass
+        _avancar_passo(dominio)
+        if cancel.cancelado:
+            return None
+
+    # --- Passo 6: outros sites / redes sociais ---
+    if flags['site'] or flags['social']:
+        try:
+            outros_sites, redes_sociais = extrair_links(pagina, redes_ld, flags['site'], flags['social'])
+        except Exception:
+            pass
+        _avancar_passo(dominio)
+        if cancel.cancelado:
+            return None
+
+    return {
+        "site": site,
+        "emails": emails if flags['email'] else [],
+        "telefones": telefones if flags['tel'] else [],
+        "enderecos": enderecos if flags['endereco'] else [],
+        "outros_sites": outros_sites if flags['site'] else [],
+        "redes_sociais": redes_sociais if flags['social'] else [],
+    }
+
+
+FLAGS_PADRAO = {'email': True, 'tel': True, 'endereco': False, 'site': False, 'social': False}
+
+
+def texto_campos(flags: Dict[str, bool]) -> str:
+    """Campos ativos como texto estável ("email,tel"), para gravar junto dos resultados."""
+    return ",".join(k for k in FLAGS_PADRAO if flags.get(k))
+
+
+def montar_consulta(busca: str, localidade: str = "", cidade: str = "", uf: str = "") -> str:
+    """Texto enviado ao buscador: termo + localidade livre + "Cidade - UF"."""
+    cidade, uf = cidade.strip(), uf.strip()
+    lugar = f"{cidade} - {uf}" if (cidade and uf) else (cidade or uf)
+    return " ".join([p for p in [busca.strip(), localidade.strip(), lugar] if p])
+
+
+def _visto_na_base(base: BaseResultados, url: str) -> bool:
+    try:
+        return base.ja_visto(url, BASE_PULAR_VISTOS_DIAS)
+    except sqlite3.Error as e:
+        print(f"Erro ao consultar a base de resultados: {e}", file=sys.stderr)
+        return False
+
+
+def executar_busca(consulta: str, flags: Dict[str, bool], num_sites: Optional[int] = None,
+                   cancel: Optional[Cancelamento] = None,
+                   ao_resultado: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   ao_total: Optional[Callable[[int], None]] = None,
+                   aceitar_url: Optional[Callable[[str], bool]] = None,
+                   manter_pool: bool = False,
+                   sink: Optional[SinkResultados] = None,
+                   retomar: bool = False, uf: str = "", cidade: str = "") -> List[Dict[str, Any]]:
+    """
+    Motor de busca sem UI: buscador -> downloads -> extração de uma consulta.
+    `ao_resultado(item)` é chamado a cada site concluído (ordem de chegada) e
+    `ao_total(sites)` quando o buscador se esgota. Retorna os itens na ordem
+    do buscador (parciais se `cancel` for cancelado).
+    `aceitar_url(url)` pode descartar URLs antes do download (ex.: já vistas
+    em outra cidade); com `manter_pool` o pool de processos fica aberto para
+    a próxima consulta (quem chamou o encerra).
+    Com `sink`, cada item é gravado (com a "consulta") assim que sai; com
+    `retomar`, URLs já gravadas para a consulta são puladas e ficam de fora
+    do retorno (estão no sink).
+    Cada site baixado também vai para a base de resultados, com `uf`/`cidade`
+    como município da busca; com BASE_PULAR_VISTOS_DIAS, sites vistos na base
+    nesse período nem são baixados. Se o buscador falhar, levanta FalhaBusca depois de
+    processar os sites que ele chegou a devolver.
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    results: List[Optional[Dict[str, Any]]] = []
+    base = base_resultados()
+
+    # Extração fora da thread principal: em processos (se configurado) ou,
+    # com o crawler ativo, na própria thread de download de cada site
+    pool_extracao = _criar_pool_extracao()
+    pos_download = None
+    if pool_extracao is not None:
+        if not manter_pool:
+            cancel.ao_cancelar(lambda: _encerrar_pool_extracao(cancelado=True))
+        pos_download = _pos_download_site(_extrator_em_processo(pool_extracao, flags), cancel)
+    elif CRAWLER_ATIVO:
+        pos_download = _pos_download_site(_extrator_local(flags), cancel)
+
+    sites = buscar_sites(consulta, num_sites=num_sites or NUM_SITES, cancel=cancel)
+    if sink is not None and retomar:
+        gravadas = sink.urls(consulta, texto_campos(flags))
+        sites = (u for u in sites if normalizar_url(u) not in gravadas)
+    if base is not None and BASE_PULAR_VISTOS_DIAS is not None:
+        sites = (u for u in sites if not _visto_na_base(base, u))
+    if aceitar_url is not None:
+        sites = (u for u in sites if aceitar_url(u))
+    try:
+        for idx, site, resp, registro in baixar_sites(sites, ao_fim_busca=ao_total,
+                                                      pos_download=pos_download,
+                                                      cancel=cancel):
+            item = _processar_site(site, resp, flags, registro, cancel)
+            if item is None:
+                break
+            if idx >= len(results):
+                results.extend([None] * (idx + 1 - len(results)))
+            results[idx] = item
+            if sink is not None:
+                sink.gravar({"consulta": consulta, "campos": texto_campos(flags), **item})
+            # Download que falhou não conta como site visto
+            if base is not None and resp is not None and resp.status_code == 200:
+                try:
+                    base.gravar(item, consulta, uf, cidade)
+                except sqlite3.Error as e:
+                    print(f"Erro ao gravar na base de resultados: {e}", file=sys.stderr)
+            if ao_resultado is not None:
+                ao_resultado(item)
+    finally:
+        if not manter_pool:
+            _encerrar_pool_extracao(cancel.cancelado)
+    return [r for r in results if r is not None]
+
+# -------------------------------------------
+# Varredura: mesma busca em todas as cidades de uma ou mais UFs
+# -------------------------------------------
+
+class CheckpointVarredura:
+    """
+    Estado de uma varredura em SQLite (DIR_DADOS/varreduras.sqlite3), para
+    retomar do ponto onde parou:
+      - cidades: cidades concluídas e seus resultados (uma transação por cidade)
+      - urls: URLs já reservadas por alguma cidade (deduplicação global)
+    URLs reservadas por cidades não concluídas são liberadas ao reabrir.
+    """
+
+    def __init__(self, caminho: str, chave: str):
+        self.chave = chave
+        self._lock = threading.Lock()
+        self._conn = conectar_sqlite(caminho)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cidades ("
+            " varredura TEXT, uf TEXT, cidade TEXT, resultados TEXT, concluida_em REAL,"
+            " PRIMARY KEY (varredura, uf, cidade))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " varredura TEXT, url TEXT, uf TEXT, cidade TEXT,"
+            " PRIMARY KEY (varredura, url))"
+        )
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM urls WHERE varredura = ? AND NOT EXISTS ("
+                " SELECT 1 FROM cidades c WHERE c.varredura = urls.varredura"
+                " AND c.uf = urls.uf AND c.cidade = urls.cidade)", (chave,))
+
+    def concluidas(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT uf, cidade, resultados FROM cidades WHERE varredura = ?", (self.chave,)
+            ).fetchall()
+        return {(uf, cidade): json.loads(res) for uf, cidade, res in rows}
+
+    def reservar_url(self, url: str, uf: str, cidade: str) -> bool:
+        """True se a URL ainda não apareceu em nenhuma cidade desta varredura."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO urls (varredura, url, uf, cidade) VALUES (?, ?, ?, ?)",
+                (self.chave, normalizar_url(url), uf, cidade))
+            return cur.rowcount == 1
+
+    def concluir_cidade(self, uf: str, cidade: str, itens: List[Dict[str, Any]]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cidades (varredura, uf, cidade, resultados, concluida_em)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self.chave, uf, cidade, json.dumps(itens, ensure_ascii=False), time.time()))
+
+    def apagar(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cidades WHERE varredura = ?", (self.chave,))
+            self._conn.execute("DELETE FROM urls WHERE varredura = ?", (self.chave,))
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+def chave_varredura(busca: str, ufs: Iterable[str], flags: Dict[str, bool],
+                    localidade: str = "", num_sites: Optional[int] = None) -> str:
+    """Identifica a varredura: repetir os mesmos parâmetros retoma o checkpoint."""
+    campos = ",".join(sorted(k for k, v in flags.items() if v))
+    return "|".join([normalizar_consulta(busca), normalizar_consulta(localidade),
+                     ",".join(sorted({u.strip().upper() for u in ufs})), campos,
+                     str(num_sites or NUM_SITES)])
+
+
+def varrer_ufs(busca: str, ufs: Iterable[str], flags: Dict[str, bool],
+               num_sites: Optional[int] = None, localidade: str = "",
+               cancel: Optional[Cancelamento] = None,
+               ao_resultado: Optional[Callable[[Dict[str, Any]], None]] = None,
+               ao_cidade: Optional[Callable[[int, int, str, str, int], None]] = None,
+               ao_inicio: Optional[Callable[[int, int], None]] = None,
+               recomecar: bool = False,
+               ao_erro: Optional[Callable[[str, str, Exception], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Roda `busca` em todos os municípios das UFs. O agendador mantém até
+    VARREDURA_CIDADES_SIMULTANEAS cidades em andamento, espaçando o início
+    das buscas em VARREDURA_INTERVALO_S. Cada URL entra uma única vez na
+    varredura inteira (a primeira cidade que a encontra fica com ela).
+
+    Cidades concluídas ficam no checkpoint em disco; repetir a chamada com os
+    mesmos parâmetros retoma de onde parou (`recomecar` descarta o progresso).
+    `ao_resultado(item)` recebe cada item (já com "uf" e "cidade"), inclusive
+    os vindos do checkpoint; `ao_inicio(total, feitas)` informa quantas cidades
+    já estavam concluídas e `ao_cidade(feitas, total, uf, cidade, sites)` é
+    chamado a cada cidade concluída. Cidades cuja busca falhou (ex.: buscador
+    bloqueado, FalhaBusca) não entram no checkpoint: ficam pendentes para a
+    próxima chamada e são informadas em `ao_erro(uf, cidade, erro)`.
+    Retorna todos os itens, na ordem das cidades.
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    ufs = _uniq([u.strip().upper() for u in ufs])
+    tarefas = [(uf, cidade) for uf in ufs for cidade in municipios_uf(uf)]
+    ckpt = CheckpointVarredura(os.path.join(DIR_DADOS, "varreduras.sqlite3"),
+                               chave_varredura(busca, ufs, flags, localidade, num_sites))
+    if recomecar:
+        ckpt.apagar()
+    por_cidade = ckpt.concluidas()
+    feitas = len([t for t in tarefas if t in por_cidade])
+    if ao_inicio is not None:
+        ao_inicio(len(tarefas), feitas)
+    for t in tarefas:
+        for item in por_cidade.get(t, []):
+            if ao_resultado is not None:
+                ao_resultado(item)
+    lock = threading.Lock()
+
+    def _cidade(uf: str, cidade: str):
+        nonlocal feitas
+        if cancel.cancelado:
+            return
+
+        def _com_local(item: Dict[str, Any]):
+            item["uf"], item["cidade"] = uf, cidade
+            if ao_resultado is not None:
+                ao_resultado(item)
+
+        try:
+            itens = executar_busca(montar_consulta(busca, localidade, cidade, uf), flags, num_sites,
+                                   cancel, ao_resultado=_com_local,
+                                   aceitar_url=lambda u: ckpt.reservar_url(u, uf, cidade),
+                                   manter_pool=True, uf=uf, cidade=cidade)
+        except Exception as e:
+            # Cidade fica pendente e é refeita ao retomar a varredura
+            print(f"Erro na varredura ({cidade} - {uf}): {e}", file=sys.stderr)
+            if ao_erro is not None and not cancel.cancelado:
+                with lock:
+                    ao_erro(uf, cidade, e)
+            return
+        if cancel.cancelado:
+            return
+        ckpt.concluir_cidade(uf, cidade, itens)
+        with lock:
+            por_cidade[(uf, cidade)] = itens
+            feitas += 1
+            if ao_cidade is not None:
+                ao_cidade(feitas, len(tarefas), uf, cidade, len(itens))
+
+    if _criar_pool_extracao() is not None:
+        cancel.ao_cancelar(lambda: _encerrar_pool_extracao(cancelado=True))
+    vagas = threading.Semaphore(max(1, VARREDURA_CIDADES_SIMULTANEAS))
+
+    def _liberar(_):
+        vagas.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, VARREDURA_CIDADES_SIMULTANEAS),
+                                thread_name_prefix="varredura") as pool:
+            primeira = True
+            for uf, cidade in tarefas:
+                if (uf, cidade) in por_cidade:
+                    continue
+                while not vagas.acquire(timeout=0.1):
+                    if cancel.cancelado:
+                        break
+                if cancel.cancelado:
+                    break
+                if not primeira and cancel.esperar(VARREDURA_INTERVALO_S):
+                    vagas.release()
+                    break
+                primeira = False
+                pool.submit(_cidade, uf, cidade).add_done_callback(_liberar)
+    finally:
+        _encerrar_pool_extracao(cancel.cancelado)
+        ckpt.fechar()
+    return [item for t in tarefas for item in por_cidade.get(t, [])]
+
+
+# -------------------------------------------
+# Fila de trabalho: varreduras divididas entre processos e máquinas
+# -------------------------------------------
+
+class FilaTrabalho:
+    """
+    Fila durável em SQLite com uma tarefa por (busca, UF, cidade). Trabalhadores
+    (processos nesta ou em outras máquinas com o arquivo em disco compartilhado)
+    arrendam tarefas por FILA_LEASE_S segundos, renovando enquanto trabalham.
+    Arrendamentos vencidos voltam para a fila; falhas são refeitas até
+    FILA_MAX_TENTATIVAS, cada vez após FILA_REPETIR_S × 2^(tentativa - 1)
+    segundos (erros passageiros, como 429, têm tempo de passar). O resultado de cada tarefa é gravado na mesma
+    transação que a marca como feita, e só pelo dono atual do arrendamento.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn = conectar_sqlite(caminho, compartilhado=True, timeout=60, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tarefas ("
+            " id INTEGER PRIMARY KEY, busca TEXT, uf TEXT, cidade TEXT, localidade TEXT,"
+            " campos TEXT, num_sites INTEGER, estado TEXT DEFAULT 'pendente',"
+            " tentativas INTEGER DEFAULT 0, dono TEXT, lease_ate REAL, erro TEXT,"
+            " nao_antes REAL,"
+            " UNIQUE (busca, uf, cidade, localidade, campos, num_sites))"
+        )
+
+        def _migrar(conn):
+            # Filas criadas antes do espaçamento entre tentativas
+            colunas = {r[1] for r in conn.execute("PRAGMA table_info(tarefas)")}
+            if "nao_antes" not in colunas:
+                conn.execute("ALTER TABLE tarefas ADD COLUMN nao_antes REAL")
+        self._transacao(_migrar)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tarefas_estado ON tarefas (estado, id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " busca TEXT, url TEXT, tarefa INTEGER, PRIMARY KEY (busca, url))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS urls_tarefa ON urls (tarefa)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS resultados (tarefa INTEGER, item TEXT)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS resultados_tarefa ON resultados (tarefa)")
+
+    def _transacao(self, fn):
+        """Executa fn(conn) numa transação com trava de escrita (BEGIN IMMEDIATE)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                r = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return r
+
+    def enfileirar(self, buscas: Iterable[str], ufs: Iterable[str], flags: Dict[str, bool],
+                   num_sites: Optional[int] = None, localidade: str = "") -> int:
+        """Cria as tarefas busca × municípios das UFs; repetidas são ignoradas. Retorna as novas."""
+        campos = texto_campos(flags)
+        linhas = [(b, uf, cidade, localidade, campos, num_sites or NUM_SITES)
+                  for uf in _uniq([u.strip().upper() for u in ufs])
+                  for cidade in municipios_uf(uf)
+                  for b in buscas]
+
+        def _inserir(conn):
+            antes = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tarefas (busca, uf, cidade, localidade, campos, num_sites)"
+                " VALUES (?, ?, ?, ?, ?, ?)", linhas)
+            return conn.total_changes - antes
+        return self._transacao(_inserir)
+
+    def arrendar(self, dono: str) -> Optional[Dict[str, Any]]:
+        """Pega a próxima tarefa pendente (ou com arrendamento vencido)."""
+        def _arrendar(conn):
+            agora = time.time()
+            # Arrendamento vencido na última tentativa: o trabalhador caiu de vez
+            conn.execute(
+                "DELETE FROM urls WHERE tarefa IN (SELECT id FROM tarefas WHERE estado = 'andamento'"
+                " AND lease_ate < ? AND tentativas >= ?)", (agora, FILA_MAX_TENTATIVAS))
+            conn.execute(
+                "UPDATE tarefas SET estado = 'falhou', lease_ate = NULL,"
+                " erro = COALESCE(erro, 'arrendamento vencido') WHERE estado = 'andamento'"
+                " AND lease_ate < ? AND tentativas >= ?", (agora, FILA_MAX_TENTATIVAS))
+            row = conn.execute(
+                "SELECT id, busca, uf, cidade, localidade, campos, num_sites FROM tarefas"
+                " WHERE ((estado = 'pendente' AND (nao_antes IS NULL OR nao_antes <= ?))"
+                " OR (estado = 'andamento' AND lease_ate < ?))"
+                " AND tentativas < ? ORDER BY id LIMIT 1", (agora, agora, FILA_MAX_TENTATIVAS)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tarefas SET estado = 'andamento', dono = ?, lease_ate = ?,"
+                " tentativas = tentativas + 1 WHERE id = ?", (dono, agora + FILA_LEASE_S, row[0]))
+            # URLs de uma tentativa anterior que não terminou voltam a ficar livres
+            conn.execute("DELETE FROM urls WHERE tarefa = ?", (row[0],))
+            chaves = ("id", "busca", "uf", "cidade", "localidade", "campos", "num_sites")
+            return dict(zip(chaves, row))
+        return self._transacao(_arrendar)
+
+    def renovar(self, tarefa: Dict[str, Any], dono: str) -> bool:
+        def _renovar(conn):
+            cur = conn.execute(
+                "UPDATE tarefas SET lease_ate = ? WHERE id = ? AND dono = ? AND estado = 'andamento'",
+                (time.time() + FILA_LEASE_S, tarefa["id"], dono))
+            return cur.rowcount == 1
+        return self._transacao(_renovar)
+
+    def reservar_url(self, tarefa: Dict[str, Any], url: str) -> bool:
+        """True se a URL ainda não apareceu em outra tarefa da mesma busca."""
+        def _reservar(conn):
+            cur = conn.execute("INSERT OR IGNORE INTO urls (busca, url, tarefa) VALUES (?, ?, ?)",
+                               (tarefa["busca"], normalizar_url(url), tarefa["id"]))
+            return cur.rowcount == 1
+        return self._transacao(_reservar)
+
+    def concluir(self, tarefa: Dict[str, Any], dono: str, itens: List[Dict[str, Any]]) -> bool:
+        """Grava os resultados e marca a tarefa como feita (False se o arrendamento foi perdido)."""
+        def _concluir(conn):
+            cur = conn.execute(
+                "UPDATE tarefas SET estado = 'feito', lease_ate = NULL, erro = NULL"
+                " WHERE id = ? AND dono = ? AND estado = 'andamento'", (tarefa["id"], dono))
+            if cur.rowcount != 1:
+                return False
+            conn.executemany("INSERT INTO resultados (tarefa, item) VALUES (?, ?)",
+                             [(tarefa["id"], json.dumps(i, ensure_ascii=False)) for i in itens])
+            return True
+        return self._transacao(_concluir)
+
+    def falhar(self, tarefa: Dict[str, Any], dono: str, erro: str):
+        """
+        Devolve a tarefa para nova tentativa, não antes de FILA_REPETIR_S ×
+        2^(tentativa - 1) segundos (ou 'falhou' após FILA_MAX_TENTATIVAS).
+        """
+        def _falhar(conn):
+            row = conn.execute("SELECT tentativas FROM tarefas WHERE id = ?", (tarefa["id"],)).fetchone()
+            espera = FILA_REPETIR_S * 2 ** max(0, (row[0] if row else 1) - 1)
+            conn.execute(
+                "UPDATE tarefas SET estado = CASE WHEN tentativas >= ? THEN 'falhou' ELSE 'pendente' END,"
+                " lease_ate = NULL, nao_antes = ?, erro = ?"
+                " WHERE id = ? AND dono = ? AND estado = 'andamento'",
+                (FILA_MAX_TENTATIVAS, time.time() + espera, erro[:500], tarefa["id"], dono))
+            conn.execute("DELETE FROM urls WHERE tarefa = ?", (tarefa["id"],))
+        self._transacao(_falhar)
+
+    def devolver(self, tarefa: Dict[str, Any], dono: str):
+        """Devolve uma tarefa interrompida (cancelamento) sem gastar tentativa."""
+        def _devolver(conn):
+            conn.execute(
+                "UPDATE tarefas SET estado = 'pendente', lease_ate = NULL, tentativas = tentativas - 1"
+                " WHERE id = ? AND dono = ? AND estado = 'andamento'", (tarefa["id"], dono))
+            conn.execute("DELETE FROM urls WHERE tarefa = ?", (tarefa["id"],))
+        self._transacao(_devolver)
+
+    def ha_trabalho(self) -> bool:
+        """
+        Se ainda há tarefas a fazer: pendentes (inclusive as que aguardam
+        nao_antes para nova tentativa), em andamento com arrendamento válido
+        ou vencidas que ainda podem ser refeitas.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM tarefas WHERE (estado = 'pendente' AND tentativas < ?)"
+                " OR (estado = 'andamento' AND (lease_ate >= ? OR tentativas < ?)) LIMIT 1",
+                (FILA_MAX_TENTATIVAS, time.time(), FILA_MAX_TENTATIVAS)
+            ).fetchone()
+        return row is not None
+
+    def situacao(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT estado, COUNT(*) FROM tarefas GROUP BY estado").fetchall()
+        return {estado: n for estado, n in rows}
+
+    def resultados(self) -> Iterable[Dict[str, Any]]:
+        """Itens de todas as tarefas feitas, na ordem em que foram enfileiradas."""
+        cur = self._conn.execute(
+            "SELECT r.item FROM resultados r JOIN tarefas t ON t.id = r.tarefa"
+            " WHERE t.estado = 'feito' ORDER BY t.id, r.rowid")
+        while True:
+            with self._lock:
+                rows = cur.fetchmany(1000)
+            if not rows:
+                break
+            for (item,) in rows:
+                yield json.loads(item)
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _dono_trabalhador() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def trabalhar_fila(caminho: str, cancel: Optional[Cancelamento] = None,
+                   ao_tarefa: Optional[Callable[[Dict[str, Any], int], None]] = None) -> int:
+    """
+    Trabalhador: arrenda tarefas da fila e roda executar_busca em cada uma até
+    a fila esvaziar (ou `cancel`). Enquanto outros trabalhadores têm tarefas em
+    andamento, espera: se eles caírem, o arrendamento vence e a tarefa volta.
+    Retorna quantas tarefas este trabalhador concluiu.
+    """
+    cancel = cancel or SEM_CANCELAMENTO
+    dono = _dono_trabalhador()
+    fila = FilaTrabalho(caminho)
+    feitas = 0
+    try:
+        while not cancel.cancelado:
+            tarefa = fila.arrendar(dono)
+            if tarefa is None:
+                if not fila.ha_trabalho() or cancel.esperar(FILA_ESPERA_S):
+                    break
+                continue
+
+            parar = threading.Event()
+
+            def _renovar(tarefa=tarefa, parar=parar):
+                while not parar.wait(FILA_LEASE_S / 3):
+                    try:
+                        fila.renovar(tarefa, dono)
+                    except Exception as e:
+                        print(f"Erro ao renovar tarefa {tarefa['id']}: {e}", file=sys.stderr)
+
+            threading.Thread(target=_renovar, name="lease", daemon=True).start()
+            try:
+                campos = set(tarefa["campos"].split(","))
+                flags = {c: c in campos for c in FLAGS_PADRAO}
+                consulta = montar_consulta(tarefa["busca"], tarefa["localidade"],
+                                           tarefa["cidade"], tarefa["uf"])
+                itens = executar_busca(consulta, flags, tarefa["num_sites"], cancel,
+                                       aceitar_url=lambda u, t=tarefa: fila.reservar_url(t, u),
+                                       uf=tarefa["uf"], cidade=tarefa["cidade"])
+            except Exception as e:
+                print(f"Erro na tarefa {tarefa['id']} ({tarefa['cidade']} - {tarefa['uf']}): {e}",
+                      file=sys.stderr)
+                fila.falhar(tarefa, dono, str(e))
+                continue
+            finally:
+                parar.set()
+            if cancel.cancelado:
+                fila.devolver(tarefa, dono)
+                break
+            for item in itens:
+                item.update(consulta=tarefa["busca"], uf=tarefa["uf"], cidade=tarefa["cidade"])
+            if fila.concluir(tarefa, dono, itens):
+                feitas += 1
+                if ao_tarefa is not None:
+                    ao_tarefa(tarefa, len(itens))
+    finally:
+        fila.fechar()
+    resumo = resumo_cache_paginas()
+    if resumo:
+        print(f"{dono}: {resumo}", file=sys.stderr)
+    return feitas
+
+
+def _processo_trabalhador(caminho: str, pular_vistos_dias: Optional[float] = None):
+    """Alvo de cada processo de trabalho (spawn): Ctrl+C devolve a tarefa atual e sai."""
+    global BASE_PULAR_VISTOS_DIAS
+    BASE_PULAR_VISTOS_DIAS = pular_vistos_dias
+    cancel = Cancelamento()
+    signal.signal(signal.SIGINT, lambda *_: cancel.cancelar())
+    trabalhar_fila(caminho, cancel, ao_tarefa=_progresso_trabalhador)
+
+
+def _progresso_trabalhador(tarefa: Dict[str, Any], sites: int):
+    print(f"[{_dono_trabalhador()}] {tarefa['busca']} – {tarefa['cidade']} - {tarefa['uf']}: "
+          f"{sites} sites", file=sys.stderr)
+
+
+def trabalhar_em_processos(caminho: str, processos: int):
+    """Roda `processos` trabalhadores em paralelo nesta máquina e espera todos terminarem."""
+    ctx = multiprocessing.get_context("spawn")
+    # Processos novos não herdam a configuração alterada pelo CLI
+    filhos = [ctx.Process(target=_processo_trabalhador, args=(caminho, BASE_PULAR_VISTOS_DIAS),
+                          name=f"trabalhador-{i}")
+              for i in range(max(1, processos))]
+    for f in filhos:
+        f.start()
+    for f in filhos:
+        f.join()
+
+# -------------------------------------------
+# Thread de busca da interface
+# -------------------------------------------
+
+def _varredura_thread(cancel: Cancelamento, busca: str, localidade: str, uf: str,
+                      flags: Dict[str, bool]):
+    """Parte de buscar_thread para "Todas as cidades do estado" (varrer_ufs)."""
+    passos_por_site = _calc_passos_por_site(flags)
+    if root is not None:
+        root.after(0, _ui_inicia_resultados)
+
+    def _inicio(total: int, feitas: int):
+        # Estimativa de NUM_SITES por cidade pendente, corrigida a cada cidade
+        global TOTAL_PASSOS
+        with _PROGRESSO_LOCK:
+            TOTAL_PASSOS = max(1, total - feitas) * NUM_SITES * passos_por_site
+        if root is not None:
+            root.after(0, _ui_begin_determinado, TOTAL_PASSOS)
+
+    def _cidade_feita(feitas: int, total: int, uf_: str, cidade: str, sites: int):
+        # Passos que a cidade não usou (menos sites que NUM_SITES) saem do total
+        global TOTAL_PASSOS
+        with _PROGRESSO_LOCK:
+            TOTAL_PASSOS -= (NUM_SITES - sites) * passos_por_site
+
+    # A varredura retoma pelo próprio checkpoint; a sessão só guarda os itens
+    sink = sink_sessao()
+    if sink is not None:
+        sink.limpar()
+
+    def _resultado(item: Dict[str, Any]):
+        if sink is not None:
+            sink.gravar({"consulta": busca, "varredura": uf, "campos": texto_campos(flags), **item})
+        _RESULTADOS_PENDENTES.append(item)
+
+    falhas: List[str] = []
+    erro_varredura: Optional[str] = None
+    ordenados: Optional[List[Dict[str, Any]]]
+    try:
+        ordenados = varrer_ufs(busca, [uf], flags, NUM_SITES, localidade, cancel,
+                               ao_resultado=_resultado, ao_cidade=_cidade_feita, ao_inicio=_inicio,
+                               ao_erro=lambda uf_, cidade, e: falhas.append(cidade))
+    except Exception as e:
+        # Ex.: checkpoint em disco travado ou cheio; a UI tem de voltar
+        print(f"Erro na varredura: {e!r}", file=sys.stderr)
+        erro_varredura = f"Erro na varredura: {e}"
+        ordenados = None
+
+    def _apply_results():
+        global SEARCH_RESULTS
+        _ui_drena_resultados()
+        if ordenados is None:
+            _ui_end(erro=erro_varredura)
+            return
+        SEARCH_RESULTS = ordenados
+        mostrar_pagina(PAGINA_ATUAL)
+        erro = None
+        if falhas and not cancel.cancelado:
+            erro = f"{len(falhas)} cidades com erro; busque de novo para retomá-las"
+        _ui_end(cancel.cancelado, erro)
+
+    if root is not None:
+        root.after(0, _apply_results)
+
+
+def buscar_thread():
+    global CANCELAMENTO, TOTAL_PASSOS, PASSOS_CONCLUIDOS
+    global PAGINAS_BAIXADAS, INICIO_BUSCA, DOMINIO_ATUAL
+    cancel = CANCELAMENTO = Cancelamento()
+    with _PROGRESSO_LOCK:
+        PASSOS_CONCLUIDOS = 0
+        PAGINAS_BAIXADAS = 0
+        DOMINIO_ATUAL = ""
+        INICIO_BUSCA = time.time()
+    _RESULTADOS_PENDENTES.clear()
+
+    busca = entry_busca.get().strip() if 'entry_busca' in globals() else ''
+    localidade = entry_localidade.get().strip() if 'entry_localidade' in globals() else ''
+    cidade = get_localidade_text()
+    flags = {
+        'email': var_email.get() if 'var_email' in globals() else True,
+        'tel': var_tel.get() if 'var_tel' in globals() else True,
+        'endereco': var_endereco.get() if 'var_endereco' in globals() else False,
+        'site': var_site.get() if 'var_site' in globals() else False,
+        'social': var_social.get() if 'var_social' in globals() else False,
     }
 
     if not any(flags.values()):
         if resultado_text is not None:
-            resultado_text.delete(1.0, tk.END)
+            _limpar_painel(resultado_text)
             resultado_text.insert(tk.END, "Selecione pelo menos uma opção para buscar.\n")
         _ui_end()
         return
     if not busca:
         if resultado_text is not None:
-            resultado_text.delete(1.0, tk.END)
+            _limpar_painel(resultado_text)
             resultado_text.insert(tk.END, "Digite o que você quer procurar no primeiro campo.\n")
         _ui_end()
         return
 
-    consulta = " ".join([p for p in [busca, localidade, cidade] if p])
-
-    # Fase 1: descobrir sites (indeterminado)
-    if root is not None:
-        root.after(0, _ui_begin_indeterminado)
-    sites = buscar_sites(consulta, num_sites=10)
-
-    if CANCELAR:
-        if root is not None:
-            root.after(0, _ui_end, True)
-        return
-    if not sites:
-        def _no_sites():
+    uf_varredura = ""
+    if 'var_todas_cidades' in globals() and var_todas_cidades.get() and estado_combo is not None:
+        uf_varredura = estado_combo.get().strip().split(" - ")[0]
+        if not uf_varredura:
             if resultado_text is not None:
-                resultado_text.delete(1.0, tk.END)
-                resultado_text.insert(tk.END, "Nenhum site foi encontrado para a consulta.\n")
-        if root is not None:
-            root.after(0, _no_sites)
-            root.after(0, _ui_end)
+                _limpar_painel(resultado_text)
+                resultado_text.insert(tk.END, "Escolha o estado para buscar em todas as cidades.\n")
+            _ui_end()
+            return
+    if uf_varredura:
+        _varredura_thread(cancel, busca, localidade, uf_varredura, flags)
         return
 
-    # Fase 2: processar sites (determinado com passos granulares)
+    consulta = montar_consulta(busca, localidade, cidade)
+
+    # Busca e downloads em pipeline: cada URL devolvida pelo buscador já
+    # segue para download. O total de passos começa pela estimativa de
+    # NUM_SITES e é corrigido quando o buscador termina.
     passos_por_site = _calc_passos_por_site(flags)
-    TOTAL_PASSOS = len(sites) * passos_por_site
-    PASSOS_CONCLUIDOS = 0
+    # Sessão em disco: repetir a busca interrompida (mesmos campos) retoma
+    # dela; busca concluída ou outra busca começa uma sessão nova
+    sink = sink_sessao()
+    campos = texto_campos(flags)
+    anteriores: List[Dict[str, Any]] = []
+    if sink is not None:
+        if not sink.concluida(consulta, campos):
+            anteriores = [_item_do_sink(i) for i in sink.itens(consulta, campos)]
+        if not anteriores:
+            sink.limpar()
+    with _PROGRESSO_LOCK:
+        TOTAL_PASSOS = max(1, NUM_SITES - len(anteriores)) * passos_por_site
     if root is not None:
         root.after(0, _ui_begin_determinado, TOTAL_PASSOS)
+        root.after(0, _ui_inicia_resultados)
+    _RESULTADOS_PENDENTES.extend(anteriores)
 
-    results: List[Dict[str, Any]] = []
+    def _fim_busca(total_sites: int):
+        global TOTAL_PASSOS
+        with _PROGRESSO_LOCK:
+            TOTAL_PASSOS = total_sites * passos_por_site
 
-    for site in sites:
-        if CANCELAR:
-            break
+    # Município escolhido nos combos, para a base de resultados
+    uf_base = estado_combo.get().strip().split(" - ")[0] if estado_combo is not None else ""
+    cidade_base = cidade_combo.get().strip() if cidade_combo is not None else ""
+    # Cada site entra no painel no próximo quadro de progresso
+    erro: Optional[str] = None
+    ordenados: Optional[List[Dict[str, Any]]]
+    try:
+        ordenados = anteriores + executar_busca(consulta, flags, NUM_SITES, cancel,
+                                                ao_resultado=_RESULTADOS_PENDENTES.append,
+                                                ao_total=_fim_busca, sink=sink, retomar=True,
+                                                uf=uf_base, cidade=cidade_base)
+        if sink is not None and not cancel.cancelado:
+            sink.concluir(consulta, campos)
+    except FalhaBusca as e:
+        # Fica o que chegou antes da falha (já no painel, na ordem de chegada)
+        print(e, file=sys.stderr)
+        erro = "Falha no buscador (tente de novo mais tarde)"
+        ordenados = None
+    except Exception as e:
+        # Ex.: disco cheio no sink, base de resultados travada; a UI tem de voltar
+        print(f"Erro na busca: {e!r}", file=sys.stderr)
+        erro = f"Erro na busca: {e}"
+        ordenados = None
 
-        dominio = urlparse(site).netloc or site
+    def _apply_results():
+        global SEARCH_RESULTS
+        _ui_drena_resultados()
+        if ordenados is None:
+            _ui_end(erro=erro)
+            return
+        # Durante a busca o painel segue a ordem de chegada; no fim a lista
+        # (e a página à mostra) volta à ordem do buscador
+        mudou = [id(r) for r in ordenados] != [id(r) for r in SEARCH_RESULTS]
+        SEARCH_RESULTS = ordenados
+        if not SEARCH_RESULTS and not cancel.cancelado:
+            render_results([])
+        elif mudou:
+            mostrar_pagina(PAGINA_ATUAL)
+        _ui_end(cancel.cancelado)
 
-        # --- Passo 1: requisição ---
-        try:
-            resp = requests.get(site, headers=_headers(), timeout=10)
-            status_ok = (resp.status_code == 200)
-        except Exception:
-            status_ok = False
-            resp = None
-        PASSOS_CONCLUIDOS += 1
-        if root is not None:
-            root.after(0, _ui_step, PASSOS_CONCLUIDOS, TOTAL_PASSOS, dominio)
-        if CANCELAR:
-            break
-        if not status_ok:
-            # Registra item vazio e segue
-            results.append({
-                "site": site,
-                "emails": [],
-                "telefones": [],
-                "enderecos": [],
-                "outros_sites": [],
-                "redes_sociais": [],
-            })
-            continue
+    if root is not None:
+        root.after(0, _apply_results)
 
-        # --- Passo 2: parse ---
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        texto = soup.get_text(separator=' ', strip=True)
-        PASSOS_CONCLUIDOS += 1
-        if root is not None:
-            root.after(0, _ui_step, PASSOS_CONCLUIDOS, TOTAL_PASSOS, dominio)
-        if CANCELAR:
-            break
+# -------------------------------------------
+# Exportação de resultados (planilha, CSV, JSON Lines, Parquet/Arrow)
+# -------------------------------------------
 
-        # Extra pre-load de json-ld (não conta passo, só otimiza)
-        tel_ld, email_ld, end_ld, redes_ld = _extrai_jsonld(soup)
+COLUNAS_PLANILHA = ["Site", "E-mails", "Telefones", "Endereços", "Outros Sites", "Redes Sociais"]
+# Campos de contato: (chave no item, tipo no layout por contato, separador na planilha)
+CAMPOS_CONTATO = (
+    ("emails", "email", ", "), ("telefones", "telefone", ", "), ("enderecos", "endereco", " | "),
+    ("outros_sites", "site", ", "), ("redes_sociais", "rede_social", ", "),
+)
+# Colunas de origem, incluídas quando o primeiro item as tiver (CLI, varreduras)
+COLUNAS_ORIGEM = (("consulta", "Consulta"), ("uf", "UF"), ("cidade", "Cidade"))
+FORMATOS_EXPORTACAO = {".xlsx": "xlsx", ".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl",
+                       ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+# Linhas acumuladas por lote nos formatos colunares
+LOTE_COLUNAR = 10_000
 
-        emails, telefones, enderecos, outros_sites, redes_sociais = [], [], [], [], []
 
-        # --- Passo 3: e-mails ---
-        if flags['email']:
-            try:
-                emails = re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", texto)
-                for href in _iter_hrefs(soup):
-                    if isinstance(href, str) and href.lower().startswith('mailto:'):
-                        emails.append(href.replace('mailto:', '').split('?')[0])
-                emails = _uniq(emails + email_ld)
-            except Exception:
-                pass
-            PASSOS_CONCLUIDOS += 1
-            if root is not None:
-                root.after(0, _ui_step, PASSOS_CONCLUIDOS, TOTAL_PASSOS, dominio)
-            if CANCELAR:
-                break
+def _linha_planilha(item: Dict[str, Any]) -> List[str]:
+    return [item.get("site", "")] + [sep.join(item.get(chave, [])) for chave, _, sep in CAMPOS_CONTATO]
 
-        # --- Passo 4: telefones ---
-        if flags['tel']:
-            try:
-                for h in _iter_hrefs(soup):
-                    if not isinstance(h, str):
-                        continue
-                    low = h.lower()
-                    if low.startswith('tel:'):
-                        telefones.append(h.replace('tel:', ''))
-                    if 'wa.me/' in low or 'whatsapp.com/send' in low:
-                        telefones.append('WhatsApp')
-                telefones += re.findall(r"\(?\d{2}\)?\s?\d{4,5}[-\s]?\d{4}", texto)
-                telefones = _uniq([t for t in telefones if len(_limpa_tel(t)) >= 10 or t == 'WhatsApp'])
-                telefones = _uniq(telefones + tel_ld)
-            except Exception:
-                pass
-            PASSOS_CONCLUIDOS += 1
-            if root is not None:
-                root.after(0, _ui_step, PASSOS_CONCLUIDOS, TOTAL_PASSOS, dominio)
-            if CANCELAR:
-                break
 
-        # --- Passo 5: endereços ---
-        if flags['endereco']:
-            try:
-                padrao_end = r"\b(?:Rua|Avenida|Av\.|Travessa|Praça|Rodovia|Estrada|Alameda|Largo|BR-|SP-|RJ-)\s+[^\n,]{3,120}"
-                enderecos = re.findall(padrao_end, texto)
-                enderecos = _uniq(enderecos + end_ld)
-            except Exception:
-                pass
-            PASSOS_CONCLUIDOS += 1
-            if root is not None:
-                root.after(0, _ui_step, PASSOS_CONCLUIDOS, TOTAL_PASSOS, dominio)
-            if CANCELAR:
-                break
+def _contatos_item(item: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+    """(tipo, valor) de cada contato do item, para o layout de uma linha por contato."""
+    for chave, tipo, _ in CAMPOS_CONTATO:
+        for valor in item.get(chave, []):
+            yield tipo, valor
 
-        # --- Passo 6: outros sites / redes sociais ---
-        if flags['site'] or flags['social']:
-            try:
-                for href in _iter_hrefs(soup):
-                    if not isinstance(href, str):
-                        continue
-                    low = href.lower()
-                    if not low.startswith('http'):
-                        continue
-                    if flags['social'] and any(s in low for s in ['facebook.com', 'instagram.com', 'twitter.com', 'x.com', 'linkedin.com', 'wa.me', 'whatsapp.com']):
-                        redes_sociais.append(href)
-                    elif flags['site']:
-                        outros_sites.append(href)
-                outros_sites = _uniq(outros_sites)
-                redes_sociais = _uniq(redes_sociais + redes_ld)
-            except Exception:
-                pass
-            PASSOS_CONCLUIDOS += 1
-            if root is not None:
-                root.after(0, _ui_step, PASSOS_CONCLUIDOS, TOTAL_PASSOS, dominio)
-            if CANCELAR:
-                break
 
-        results.append({
-            "site": site,
-            "emails": emails if flags['email'] else [],
-            "telefones": telefones if flags['tel'] else [],
-            "enderecos": enderecos if flags['endereco'] else [],
-            "outros_sites": outros_sites if flags['site'] else [],
-            "redes_sociais": redes_sociais if flags['social'] else [],
-        })
+def formato_exportacao(caminho: str) -> str:
+    formato = FORMATOS_EXPORTACAO.get(os.path.splitext(caminho)[1].lower())
+    if formato is None:
+        raise ValueError(f"Formato não suportado: {caminho} "
+                         f"(use {', '.join(sorted(FORMATOS_EXPORTACAO))})")
+    return formato
 
-    def _apply_results():
-        global SEARCH_RESULTS
-        SEARCH_RESULTS = results
-        render_results(results)
-        _ui_end(CANCELAR)
 
-    if root is not None:
-        root.after(0, _apply_results)
+class Exportador(abc.ABC):
+    """
+    Escrita incremental de resultados: escrever(item) a cada site e fechar()
+    no fim, em memória constante. O cabeçalho sai no primeiro item (as colunas
+    de origem dependem dele). `por_contato` troca o layout de uma linha por
+    site para uma linha por contato (site, tipo, contato).
+    Caminho '-' = saída padrão (só CSV e JSON Lines).
+    """
+
+    def __init__(self, caminho: str, por_contato: bool = False, anexar: bool = False):
+        self.caminho = caminho
+        self.por_contato = por_contato
+        self.anexar = anexar
+        self.origem: Optional[List[Tuple[str, str]]] = None
+        self.linhas = 0
+
+    def _cabecalho(self) -> List[str]:
+        rotulos = [r for _, r in self.origem or []]
+        return rotulos + (["Site", "Tipo", "Contato"] if self.por_contato else COLUNAS_PLANILHA)
+
+    def _linhas(self, item: Dict[str, Any]) -> Iterable[List[str]]:
+        origem = [str(item.get(k, "")) for k, _ in self.origem or []]
+        if self.por_contato:
+            for tipo, valor in _contatos_item(item):
+                yield origem + [item.get("site", ""), tipo, valor]
+        else:
+            yield origem + _linha_planilha(item)
+
+    def escrever(self, item: Dict[str, Any]):
+        if self.origem is None:
+            self.origem = [(k, r) for k, r in COLUNAS_ORIGEM if k in item]
+            self._abrir()
+        self._escrever(item)
+
+    def fechar(self):
+        if self.origem is None:
+            self.origem = []
+            self._abrir()
+        self._fechar()
+
+    @abc.abstractmethod
+    def _abrir(self):
+        ...
+
+    @abc.abstractmethod
+    def _escrever(self, item: Dict[str, Any]):
+        ...
+
+    @abc.abstractmethod
+    def _fechar(self):
+        ...
+
+
+class ExportadorPlanilha(Exportador):
+    """.xlsx em modo write-only do openpyxl (linhas vão direto para o arquivo)."""
+
+    def _abrir(self):
+        from openpyxl import Workbook
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(title="Resultados")
+        self._ws.append(self._cabecalho())
+
+    def _escrever(self, item):
+        for linha in self._linhas(item):
+            self._ws.append(linha)
+            self.linhas += 1
+
+    def _fechar(self):
+        self._wb.save(self.caminho)
+
+
+class ExportadorCSV(Exportador):
+    """CSV com BOM UTF-8 (o Excel reconhece os acentos)."""
+
+    def _abrir(self):
+        if self.caminho == "-":
+            self._arq = sys.stdout
+        else:
+            self._arq = open(self.caminho, "w", encoding="utf-8-sig", newline="")
+        self._csv = csv.writer(self._arq)
+        self._csv.writerow(self._cabecalho())
+
+    def _escrever(self, item):
+        for linha in self._linhas(item):
+            self._csv.writerow(linha)
+            self.linhas += 1
+
+    def _fechar(self):
+        self._arq.flush()
+        if self._arq is not sys.stdout:
+            self._arq.close()
+
+
+class ExportadorJSONL(Exportador):
+    """JSON Lines: o item como está (listas preservadas) ou um objeto por contato."""
+
+    def _abrir(self):
+        if self.caminho == "-":
+            self._arq = sys.stdout
+        else:
+            self._arq = open(self.caminho, "a" if self.anexar else "w", encoding="utf-8")
+
+    def _escrever(self, item):
+        if self.por_contato:
+            origem = {k: item[k] for k, _ in self.origem or [] if k in item}
+            objetos = [{**origem, "site": item.get("site", ""), "tipo": t, "contato": v}
+                       for t, v in _contatos_item(item)]
+        else:
+            objetos = [item]
+        for obj in objetos:
+            self._arq.write(json.dumps(obj, ensure_ascii=False) + "\n")
+            self.linhas += 1
+        if self._arq is sys.stdout:
+            self._arq.flush()
+
+    def _fechar(self):
+        if self._arq is not sys.stdout:
+            self._arq.close()
+
+
+class ExportadorColunar(Exportador):
+    """
+    Parquet ou Arrow IPC (pacote opcional pyarrow), gravados em lotes de
+    LOTE_COLUNAR linhas. No layout por site os contatos ficam em colunas list<string>.
+    """
+
+    def __init__(self, caminho: str, por_contato: bool = False, anexar: bool = False,
+                 formato: str = "parquet"):
+        super().__init__(caminho, por_contato, anexar)
+        self.formato = formato
+
+    def _abrir(self):
+        import pyarrow as pa
+        texto, lista = pa.string(), pa.list_(pa.string())
+        campos = [(k, texto) for k, _ in self.origem or []]
+        if self.por_contato:
+            campos += [("site", texto), ("tipo", texto), ("contato", texto)]
+        else:
+            campos += [("site", texto)] + [(chave, lista) for chave, _, _ in CAMPOS_CONTATO]
+        self._pa = pa
+        self._schema = pa.schema(campos)
+        self._lote: Dict[str, List[Any]] = {nome: [] for nome in self._schema.names}
+        if self.formato == "parquet":
+            import pyarrow.parquet as pq
+            self._escritor = pq.ParquetWriter(self.caminho, self._schema)
+        else:
+            self._escritor = pa.ipc.new_file(self.caminho, self._schema)
+
+    def _escrever(self, item):
+        origem = [str(item.get(k, "")) for k, _ in self.origem or []]
+        if self.por_contato:
+            linhas = [origem + [item.get("site", ""), t, v] for t, v in _contatos_item(item)]
+        else:
+            linhas = [origem + [item.get("site", "")] + [list(item.get(c, [])) for c, _, _ in CAMPOS_CONTATO]]
+        for linha in linhas:
+            for nome, valor in zip(self._schema.names, linha):
+                self._lote[nome].append(valor)
+            self.linhas += 1
+        if len(self._lote["site"]) >= LOTE_COLUNAR:
+            self._descarregar()
+
+    def _descarregar(self):
+        if self._lote["site"]:
+            tabela = self._pa.Table.from_pydict(self._lote, schema=self._schema)
+            self._escritor.write_table(tabela)
+            self._lote = {nome: [] for nome in self._schema.names}
+
+    def _fechar(self):
+        self._descarregar()
+        self._escritor.close()
+
+
+def abrir_exportador(caminho: str, por_contato: bool = False, anexar: bool = False) -> Exportador:
+    """Exportador conforme a extensão do arquivo ('-' = JSON Lines na saída padrão)."""
+    formato = "jsonl" if caminho == "-" else formato_exportacao(caminho)
+    if formato == "xlsx":
+        return ExportadorPlanilha(caminho, por_contato)
+    if formato == "csv":
+        return ExportadorCSV(caminho, por_contato)
+    if formato == "jsonl":
+        return ExportadorJSONL(caminho, por_contato, anexar)
+    # pyarrow é opcional: falta dele aparece já aqui, antes de qualquer busca
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Exportar Parquet/Arrow requer o pacote pyarrow (pip install pyarrow).") from e
+    return ExportadorColunar(caminho, por_contato, formato=formato)
+
+
+def exportar_resultados(caminho: str, itens: Iterable[Dict[str, Any]], por_contato: bool = False,
+                        cancel: Optional[Cancelamento] = None) -> int:
+    """Grava `itens` (qualquer iterável, consumido uma vez) no formato da extensão. Retorna as linhas."""
+    cancel = cancel or SEM_CANCELAMENTO
+    exportador = abrir_exportador(caminho, por_contato)
+    for item in itens:
+        if cancel.cancelado:
+            break
+        exportador.escrever(item)
+    exportador.fechar()
+    return exportador.linhas
+
 
 # -------------------------------------------
 # Ações de UI
 # -------------------------------------------
 
 def buscar():
+    # Bloqueia o botão já no clique: a thread ainda pode demorar a chegar ao
+    # primeiro passo (ex.: municípios e checkpoint da varredura) e um segundo
+    # clique trocaria o CANCELAMENTO da busca em andamento
+    _ui_begin_indeterminado()
     threading.Thread(target=buscar_thread, daemon=True).start()
 
 
@@ -632,10 +3859,17 @@ def limpar_total():
             var_site.set(False)
         if 'var_social' in globals():
             var_social.set(False)
+        if 'var_todas_cidades' in globals():
+            var_todas_cidades.set(False)
         if resultado_text is not None:
-            resultado_text.delete(1.0, tk.END)
-        global SEARCH_RESULTS
+            _limpar_painel(resultado_text)
+        global SEARCH_RESULTS, PAGINA_ATUAL
         SEARCH_RESULTS = []
+        PAGINA_ATUAL = 0
+        sink = sink_sessao()
+        if sink is not None:
+            sink.limpar()
+        _ui_atualiza_paginacao()
         if status_label is not None:
             status_label.config(text="Pronto")
         try:
@@ -646,131 +3880,475 @@ def limpar_total():
         if progress is not None:
             progress['value'] = 0
     except Exception as e:
-        print(f"Erro ao limpar: {e}")
+        print(f"Erro ao limpar: {e}", file=sys.stderr)
 
 
 def gerar_planilha():
-    try:
-        if not SEARCH_RESULTS:
-            messagebox.showinfo("Gerar planilha", "Nenhum dado para exportar. Faça uma busca primeiro.")
-            return
-        path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel", "*.xlsx")],
-            title="Salvar planilha"
-        )
-        if not path:
-            return
+    """Exporta os resultados no formato escolhido numa thread (a janela segue respondendo)."""
+    if not SEARCH_RESULTS:
+        messagebox.showinfo("Gerar planilha", "Nenhum dado para exportar. Faça uma busca primeiro.")
+        return
+    path = filedialog.asksaveasfilename(
+        defaultextension=".xlsx",
+        filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv"), ("JSON Lines", "*.jsonl"),
+                   ("Parquet", "*.parquet")],
+        title="Salvar planilha"
+    )
+    if not path:
+        return
+    por_contato = var_por_contato.get() if 'var_por_contato' in globals() else False
+    resultados = SEARCH_RESULTS
+    if btn_planilha is not None:
+        btn_planilha.config(state="disabled")
+    if status_label is not None:
+        status_label.config(text="Exportando…")
 
-        wb = Workbook()
-        default_ws = wb.active
-        if default_ws is not None:
-            wb.remove(default_ws)
-        ws = wb.create_sheet(title="Resultados", index=0)
-
-        ws.append(["Site", "E-mails", "Telefones", "Endereços", "Outros Sites", "Redes Sociais"])
-        for item in SEARCH_RESULTS:
-            ws.append([
-                item.get("site", ""),
-                ", ".join(item.get("emails", [])),
-                ", ".join(item.get("telefones", [])),
-                " | ".join(item.get("enderecos", [])),
-                ", ".join(item.get("outros_sites", [])),
-                ", ".join(item.get("redes_sociais", [])),
-            ])
-        wb.save(path)
-        messagebox.showinfo("Gerar planilha", f"Planilha salva em:\n{path}")
-    except Exception as e:
-        messagebox.showerror("Gerar planilha", f"Erro ao salvar planilha:\n{e}")
+    def _fim(erro: Optional[Exception]):
+        if btn_planilha is not None:
+            btn_planilha.config(state="normal")
+        if status_label is not None:
+            status_label.config(text="Pronto")
+        if erro is None:
+            messagebox.showinfo("Gerar planilha", f"Planilha salva em:\n{path}")
+        else:
+            messagebox.showerror("Gerar planilha", f"Erro ao salvar planilha:\n{erro}")
+
+    def _exportar():
+        erro = None
+        try:
+            exportar_resultados(path, resultados, por_contato)
+        except Exception as e:
+            erro = e
+        if root is not None:
+            root.after(0, _fim, erro)
+
+    threading.Thread(target=_exportar, name="exportacao", daemon=True).start()
 
 # -------------------------------------------
 # Interface gráfica
 # -------------------------------------------
 
-root = tk.Tk()
-root.title("Raspador de Email")
-root.geometry("1100x820")
-root.minsize(900, 640)
+def _restaurar_sessao():
+    """Mostra os resultados gravados da última busca (ex.: janela fechada ou queda no meio)."""
+    global SEARCH_RESULTS
+    sink = sink_sessao()
+    if sink is None:
+        return
+    itens = [_item_do_sink(i) for i in sink.itens()]
+    if not itens:
+        return
+    SEARCH_RESULTS = itens
+    mostrar_pagina(0)
+    if status_label is not None:
+        status_label.config(text=f"Resultados da sessão anterior: {len(itens)} sites")
 
-# Inputs
-frm_inputs = tk.Frame(root)
-frm_inputs.pack(fill="x", padx=10, pady=(10, 0))
 
-lbl1 = tk.Label(frm_inputs, text="O que você quer procurar?")
-lbl1.grid(row=0, column=0, sticky="w")
-entry_busca = tk.Entry(frm_inputs, width=60)
-entry_busca.grid(row=1, column=0, sticky="w")
+# Somente leitura sem state='disabled' (para manter links clicáveis)
+def _make_text_readonly(widget: tk.Text):
+    for seq in ("<Key>", "<Control-v>", "<Control-V>", "<<Paste>>",
+                "<Button-2>", "<BackSpace>", "<Delete>",
+                "<Control-x>", "<Control-X>"):
+        widget.bind(seq, lambda e: "break")
+    widget.config(cursor="arrow")
 
-lbl2 = tk.Label(frm_inputs, text="Bairro/Localidade (opcional)")
-lbl2.grid(row=0, column=1, sticky="w", padx=(20, 0))
-entry_localidade = tk.Entry(frm_inputs, width=40)
-entry_localidade.grid(row=1, column=1, sticky="w", padx=(20, 0))
 
-lbl3 = tk.Label(frm_inputs, text="Estado (UF)")
-lbl3.grid(row=2, column=0, sticky="w", pady=(10, 0))
-estado_combo = ttk.Combobox(frm_inputs, width=30, state="readonly")
-estado_combo.grid(row=3, column=0, sticky="w")
-estado_combo.bind("<<ComboboxSelected>>", on_estado_selecionado)
+def montar_interface():
+    """Cria a janela e os widgets (preenche os globais usados pelas funções acima)."""
+    global root, estado_combo, cidade_combo, resultado_text, btn_buscar, btn_limpar
+    global btn_planilha, btn_cancelar, status_label, progress
+    global pagina_label, btn_pagina_anterior, btn_pagina_proxima
+    global entry_busca, entry_localidade, var_email, var_tel, var_endereco, var_site, var_social
+    global var_todas_cidades, var_por_contato
 
-lbl4 = tk.Label(frm_inputs, text="Cidade (município)")
-lbl4.grid(row=2, column=1, sticky="w", pady=(10, 0), padx=(20, 0))
-cidade_combo = ttk.Combobox(frm_inputs, width=40)
-cidade_combo.grid(row=3, column=1, sticky="w", padx=(20, 0))
+    if tk is None:
+        raise SystemExit("Tkinter não está disponível; use o modo linha de comando (python main.py --help).")
+    root = tk.Tk()
+    root.title("Raspador de Email")
+    root.geometry("1100x820")
+    root.minsize(900, 640)
 
-# Opções de busca
-frame_opcoes = tk.Frame(root)
-frame_opcoes.pack(fill="x", pady=5)
+    # Inputs
+    frm_inputs = tk.Frame(root)
+    frm_inputs.pack(fill="x", padx=10, pady=(10, 0))
 
-var_email = tk.BooleanVar(value=True)
-var_tel = tk.BooleanVar(value=True)
-var_endereco = tk.BooleanVar(value=False)
-var_site = tk.BooleanVar(value=False)
-var_social = tk.BooleanVar(value=False)
+    lbl1 = tk.Label(frm_inputs, text="O que você quer procurar?")
+    lbl1.grid(row=0, column=0, sticky="w")
+    entry_busca = tk.Entry(frm_inputs, width=60)
+    entry_busca.grid(row=1, column=0, sticky="w")
 
-tk.Checkbutton(frame_opcoes, text="E-mail", variable=var_email).pack(side=tk.LEFT, padx=5)
-tk.Checkbutton(frame_opcoes, text="Telefone", variable=var_tel).pack(side=tk.LEFT, padx=5)
-tk.Checkbutton(frame_opcoes, text="Endereço", variable=var_endereco).pack(side=tk.LEFT, padx=5)
-tk.Checkbutton(frame_opcoes, text="Site", variable=var_site).pack(side=tk.LEFT, padx=5)
-tk.Checkbutton(frame_opcoes, text="Rede Social", variable=var_social).pack(side=tk.LEFT, padx=5)
+    lbl2 = tk.Label(frm_inputs, text="Bairro/Localidade (opcional)")
+    lbl2.grid(row=0, column=1, sticky="w", padx=(20, 0))
+    entry_localidade = tk.Entry(frm_inputs, width=40)
+    entry_localidade.grid(row=1, column=1, sticky="w", padx=(20, 0))
 
-# Botões e barra de progresso
-btn_frame = tk.Frame(root)
-btn_frame.pack(fill="x", pady=10)
+    lbl3 = tk.Label(frm_inputs, text="Estado (UF)")
+    lbl3.grid(row=2, column=0, sticky="w", pady=(10, 0))
+    estado_combo = ttk.Combobox(frm_inputs, width=30, state="readonly")
+    estado_combo.grid(row=3, column=0, sticky="w")
+    estado_combo.bind("<<ComboboxSelected>>", on_estado_selecionado)
 
-btn_buscar = tk.Button(btn_frame, text="Buscar", command=buscar)
-btn_buscar.pack(side=tk.LEFT, padx=5)
+    lbl4 = tk.Label(frm_inputs, text="Cidade (município)")
+    lbl4.grid(row=2, column=1, sticky="w", pady=(10, 0), padx=(20, 0))
+    cidade_combo = ttk.Combobox(frm_inputs, width=40)
+    cidade_combo.grid(row=3, column=1, sticky="w", padx=(20, 0))
+    cidade_combo.bind("<KeyRelease>", on_cidade_digitada)
+    cidade_combo.bind("<<ComboboxSelected>>", on_cidade_selecionada)
 
-btn_limpar = tk.Button(btn_frame, text="Limpar", command=limpar_total)
-btn_limpar.pack(side=tk.LEFT, padx=5)
+    var_todas_cidades = tk.BooleanVar(value=False)
+    tk.Checkbutton(frm_inputs, text="Todas as cidades do estado",
+                   variable=var_todas_cidades).grid(row=3, column=2, sticky="w", padx=(10, 0))
 
-btn_planilha = tk.Button(btn_frame, text="Gerar Planilha", command=gerar_planilha)
-btn_planilha.pack(side=tk.LEFT, padx=5)
+    # Opções de busca
+    frame_opcoes = tk.Frame(root)
+    frame_opcoes.pack(fill="x", pady=5)
 
-btn_cancelar = tk.Button(btn_frame, text="Cancelar", command=cancelar_busca, state="disabled")
-btn_cancelar.pack(side=tk.LEFT, padx=5)
+    var_email = tk.BooleanVar(value=True)
+    var_tel = tk.BooleanVar(value=True)
+    var_endereco = tk.BooleanVar(value=False)
+    var_site = tk.BooleanVar(value=False)
+    var_social = tk.BooleanVar(value=False)
 
-status_label = ttk.Label(btn_frame, text="Pronto")
-status_label.pack(side=tk.RIGHT, padx=10)
+    tk.Checkbutton(frame_opcoes, text="E-mail", variable=var_email).pack(side=tk.LEFT, padx=5)
+    tk.Checkbutton(frame_opcoes, text="Telefone", variable=var_tel).pack(side=tk.LEFT, padx=5)
+    tk.Checkbutton(frame_opcoes, text="Endereço", variable=var_endereco).pack(side=tk.LEFT, padx=5)
+    tk.Checkbutton(frame_opcoes, text="Site", variable=var_site).pack(side=tk.LEFT, padx=5)
+    tk.Checkbutton(frame_opcoes, text="Rede Social", variable=var_social).pack(side=tk.LEFT, padx=5)
 
-progress = ttk.Progressbar(root, mode="determinate")
-progress.pack(fill="x", padx=10)
+    # Botões e barra de progresso
+    btn_frame = tk.Frame(root)
+    btn_frame.pack(fill="x", pady=10)
 
-# Área de resultados
-resultado_frame = tk.Frame(root)
-resultado_frame.pack(fill="both", expand=True, padx=10, pady=10)
-resultado_text = scrolledtext.ScrolledText(resultado_frame, wrap="word")
-resultado_text.pack(fill="both", expand=True)
+    btn_buscar = tk.Button(btn_frame, text="Buscar", command=buscar)
+    btn_buscar.pack(side=tk.LEFT, padx=5)
 
-# Somente leitura sem state='disabled' (para manter links clicáveis)
+    btn_limpar = tk.Button(btn_frame, text="Limpar", command=limpar_total)
+    btn_limpar.pack(side=tk.LEFT, padx=5)
 
-def _make_text_readonly(widget: tk.Text):
-    for seq in ("<Key>", "<Control-v>", "<Control-V>", "<<Paste>>",
-                "<Button-2>", "<BackSpace>", "<Delete>",
-                "<Control-x>", "<Control-X>"):
-        widget.bind(seq, lambda e: "break")
-    widget.config(cursor="arrow")
+    btn_planilha = tk.Button(btn_frame, text="Gerar Planilha", command=gerar_planilha)
+    btn_planilha.pack(side=tk.LEFT, padx=5)
+    var_por_contato = tk.BooleanVar(value=False)
+    tk.Checkbutton(btn_frame, text="Uma linha por contato", variable=var_por_contato).pack(side=tk.LEFT)
+
+    btn_cancelar = tk.Button(btn_frame, text="Cancelar", command=cancelar_busca, state="disabled")
+    btn_cancelar.pack(side=tk.LEFT, padx=5)
+
+    status_label = ttk.Label(btn_frame, text="Pronto")
+    status_label.pack(side=tk.RIGHT, padx=10)
+
+    progress = ttk.Progressbar(root, mode="determinate")
+    progress.pack(fill="x", padx=10)
+
+    # Paginação dos resultados
+    pag_frame = tk.Frame(root)
+    pag_frame.pack(fill="x", padx=10, pady=(10, 0))
+    btn_pagina_anterior = tk.Button(pag_frame, text="◀ Anterior", state="disabled",
+                                    command=lambda: mostrar_pagina(PAGINA_ATUAL - 1))
+    btn_pagina_anterior.pack(side=tk.LEFT)
+    btn_pagina_proxima = tk.Button(pag_frame, text="Próxima ▶", state="disabled",
+                                   command=lambda: mostrar_pagina(PAGINA_ATUAL + 1))
+    btn_pagina_proxima.pack(side=tk.LEFT, padx=5)
+    pagina_label = ttk.Label(pag_frame, text="")
+    pagina_label.pack(side=tk.LEFT, padx=10)
+
+    # Área de resultados
+    resultado_frame = tk.Frame(root)
+    resultado_frame.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+    resultado_text = scrolledtext.ScrolledText(resultado_frame, wrap="word")
+    resultado_text.pack(fill="both", expand=True)
+
+    _make_text_readonly(resultado_text)
+    configurar_links(resultado_text)
+
+    carregar_estados()
+    root.after_idle(_restaurar_sessao)
+    # Índice de municípios: lido do disco e atualizado (se vencido) sem travar a janela
+    threading.Thread(target=_preparar_municipios, name="municipios", daemon=True).start()
+
+
+def _relatar_inicio():
+    """Benchmark de início: tempo até a primeira pintura da janela; depois fecha."""
+    root.update()
+    decorrido = (time.perf_counter() - _INICIO_PROCESSO) * 1000
+    carregados = [m for m in ("requests", "bs4", "openpyxl", "googlesearch") if m in sys.modules]
+    print(f"Janela pintada em {decorrido:.0f} ms (módulos pesados carregados: "
+          f"{', '.join(carregados) or 'nenhum'})", file=sys.stderr)
+    root.destroy()
+
+# -------------------------------------------
+# Linha de comando (sem interface gráfica)
+# -------------------------------------------
+
+def _ler_consultas(caminho: str) -> List[str]:
+    """Uma consulta por linha ('-' = entrada padrão); linhas vazias e '#' são ignoradas."""
+    arquivo = sys.stdin if caminho == "-" else open(caminho, encoding="utf-8")
+    try:
+        return [l.strip() for l in arquivo if l.strip() and not l.lstrip().startswith("#")]
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def _argumentos_cli(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="procura",
+        description="Procura sites e extrai contatos sem abrir a interface gráfica.")
+    p.add_argument("consultas", nargs="*", metavar="CONSULTA",
+                   help="o que procurar (uma busca por consulta)")
+    p.add_argument("-a", "--arquivo-consultas", metavar="ARQ",
+                   help="arquivo com uma consulta por linha ('-' = entrada padrão)")
+    p.add_argument("--uf", default="", help="sigla do estado (ex.: SP)")
+    p.add_argument("--cidade", default="", help="município")
+    p.add_argument("--local", default="", help="bairro, região ou outro texto de localidade")
+    p.add_argument("--varrer-uf", metavar="UFS", default="",
+                   help="busca em todos os municípios das UFs (ex.: SP, SP,MG ou TODAS); "
+                        "retoma se interrompida")
+    p.add_argument("--recomecar", action="store_true",
+                   help="com --varrer-uf, descarta o progresso salvo e começa do zero")
+    p.add_argument("--atualizar-municipios", action="store_true",
+                   help=f"baixa do IBGE o índice de municípios ({ARQUIVO_MUNICIPIOS}) e sai")
+    p.add_argument("--embutir-municipios", action="store_true",
+                   help="como --atualizar-municipios, mas grava o índice também ao lado do "
+                        "main.py, para o build embutir no executável (reserva sem rede)")
+    p.add_argument("--campos", default="email,tel",
+                   help="campos extraídos, separados por vírgula: email,tel,endereco,site,social")
+    p.add_argument("-n", "--sites", type=int, default=NUM_SITES, help="sites por consulta")
+    p.add_argument("-o", "--saida", default="-",
+                   help="arquivo de saída, formato pela extensão: .xlsx, .csv, .jsonl, .parquet "
+                        "ou .arrow ('-' = JSON Lines na saída padrão)")
+    p.add_argument("--retomar", action="store_true",
+                   help="com --saida .jsonl, anexa a ela e pula sites já gravados nela para a "
+                        "mesma consulta (sem --retomar a saída é sobrescrita)")
+    p.add_argument("--por-contato", action="store_true",
+                   help="uma linha por contato (site, tipo, contato) em vez de uma por site")
+    fila = p.add_argument_group("fila de trabalho (varreduras em vários processos/máquinas)")
+    fila.add_argument("--fila", metavar="ARQ",
+                      help="arquivo SQLite da fila (pode estar em disco compartilhado); "
+                           f"padrão {os.path.join(DIR_DADOS, 'fila.sqlite3')}")
+    fila.add_argument("--enfileirar", action="store_true",
+                      help="cria tarefas CONSULTA × municípios de --varrer-uf na fila")
+    fila.add_argument("--trabalhar", type=int, metavar="N", default=0,
+                      help="roda N processos trabalhadores até a fila esvaziar")
+    fila.add_argument("--exportar", action="store_true",
+                      help="grava em --saida os resultados das tarefas concluídas")
+    base = p.add_argument_group("base de resultados (sites de todas as buscas anteriores)")
+    base.add_argument("--base", action="store_true",
+                      help="grava em --saida sites da base em vez de buscar, filtrados por "
+                           "--cidade/--uf e pelas opções abaixo")
+    base.add_argument("--dias", type=float, metavar="N",
+                      help="só sites vistos nos últimos N dias")
+    base.add_argument("--dominio", default="", help="só sites do domínio")
+    base.add_argument("--email", default="", help="só sites com este e-mail")
+    base.add_argument("--telefone", default="", help="só sites com este telefone")
+    base.add_argument("--pular-vistos", type=float, metavar="N",
+                      help="ao buscar, não baixa sites já gravados na base nos últimos N dias")
+    return p.parse_args(argv)
+
+
+def _ufs_cli(texto: str) -> List[str]:
+    """'SP,MG' -> ['SP', 'MG']; 'TODAS' -> todas as UFs."""
+    siglas = [u.strip().upper() for u in texto.split(",") if u.strip()]
+    if "TODAS" in siglas:
+        return [sigla for sigla, _ in UFS]
+    return siglas
+
+
+def _main_fila(args: argparse.Namespace, consultas: List[str], flags: Dict[str, bool]) -> int:
+    caminho = args.fila or os.path.join(DIR_DADOS, "fila.sqlite3")
+    if args.enfileirar:
+        if not consultas or not args.varrer_uf:
+            print("--enfileirar precisa de CONSULTA e --varrer-uf.", file=sys.stderr)
+            return 2
+        fila = FilaTrabalho(caminho)
+        try:
+            novas = fila.enfileirar(consultas, _ufs_cli(args.varrer_uf), flags, args.sites, args.local)
+        finally:
+            fila.fechar()
+        print(f"{novas} tarefas novas em {caminho}", file=sys.stderr)
+    if args.trabalhar > 0:
+        trabalhar_em_processos(caminho, args.trabalhar)
+    fila = FilaTrabalho(caminho)
+    try:
+        if args.exportar:
+            exportar_resultados(args.saida, fila.resultados(), args.por_contato)
+        situacao = fila.situacao()
+    except (ValueError, RuntimeError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        fila.fechar()
+    print("Fila: " + (", ".join(f"{n} {estado}" for estado, n in sorted(situacao.items())) or "vazia"),
+          file=sys.stderr)
+    return 0
+
+
+def _main_base(args: argparse.Namespace) -> int:
+    base = base_resultados()
+    if base is None:
+        print("Base de resultados indisponível.", file=sys.stderr)
+        return 1
+    try:
+        linhas = exportar_resultados(
+            args.saida, base.consultar(cidade=args.cidade, uf=args.uf, dias=args.dias,
+                                       dominio=args.dominio, email=args.email,
+                                       telefone=args.telefone),
+            args.por_contato)
+    except (ValueError, RuntimeError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    total = base.estatisticas()
+    print(f"{linhas} linhas da base {base.caminho} ({total['sites']} sites, "
+          f"{total['emails']} e-mails, {total['telefones']} telefones)", file=sys.stderr)
+    return 0
+
+
+def _inicio_varredura_cli(total: int, feitas: int):
+    if feitas:
+        print(f"Retomando varredura: {feitas}/{total} cidades já concluídas", file=sys.stderr)
+
+
+def _progresso_varredura_cli(feitas: int, total: int, uf: str, cidade: str, sites: int):
+    print(f"[{feitas}/{total}] {cidade} - {uf}: {sites} sites novos", file=sys.stderr)
+
+
+def _gravador_varredura(sink: Optional[SinkResultados], busca: str, flags: Dict[str, bool],
+                        varredura: str):
+    """ao_resultado da varredura no CLI: grava cada item no sink uma única vez."""
+    if sink is None:
+        return None
+    campos = texto_campos(flags)
+    gravadas = sink.urls(busca, campos, varredura)
+
+    def _gravar(item: Dict[str, Any]):
+        chave = normalizar_url(item.get("site", ""))
+        if chave not in gravadas:
+            gravadas.add(chave)
+            sink.gravar({"consulta": busca, "varredura": varredura, "campos": campos, **item})
+    return _gravar
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    """Roda várias consultas no mesmo processo e grava os resultados (JSON Lines ou .xlsx)."""
+    global CANCELAMENTO, BASE_PULAR_VISTOS_DIAS
+    args = _argumentos_cli(argv)
+    consultas = list(args.consultas)
+    if args.arquivo_consultas:
+        consultas += _ler_consultas(args.arquivo_consultas)
+    if args.atualizar_municipios or args.embutir_municipios:
+        if not carregar_indice_municipios(atualizar=True):
+            print("Não foi possível baixar os municípios do IBGE.", file=sys.stderr)
+            return 1
+        caminho = os.path.join(DIR_DADOS, ARQUIVO_MUNICIPIOS)
+        if args.embutir_municipios:
+            caminho = _caminho_indice_embutido()
+            _gravar_indice_municipios(dict(MUNICIPIOS_CACHE), caminho)
+        print(f"{sum(len(c) for c in MUNICIPIOS_CACHE.values())} municípios em {caminho}",
+              file=sys.stderr)
+        return 0
+    modo_fila = bool(args.fila or args.enfileirar or args.trabalhar or args.exportar)
+    if not consultas and not modo_fila and not args.base:
+        print("Nenhuma consulta informada (use CONSULTA ou --arquivo-consultas).", file=sys.stderr)
+        return 2
+    campos = {c.strip() for c in args.campos.split(",") if c.strip()}
+    invalidos = campos - set(FLAGS_PADRAO)
+    if invalidos or not campos:
+        print(f"Campos inválidos: {', '.join(sorted(invalidos)) or '(nenhum)'}", file=sys.stderr)
+        return 2
+    flags = {c: c in campos for c in FLAGS_PADRAO}
+    if args.pular_vistos is not None:
+        BASE_PULAR_VISTOS_DIAS = args.pular_vistos
+
+    # Cidade digitada livremente vira o par canônico (nome, UF); --local que
+    # seja só um município também (ex.: --local "sao jose dos campos/sp")
+    if args.cidade:
+        par = resolver_cidade(args.cidade, args.uf)
+        if par is None:
+            print(f"Município não reconhecido, usado como digitado: {args.cidade}", file=sys.stderr)
+        else:
+            args.cidade, args.uf = par
+    elif args.local and not args.varrer_uf:
+        par = resolver_cidade(args.local, args.uf, aproximado=False)
+        if par is not None:
+            (args.cidade, args.uf), args.local = par, ""
+
+    if args.base:
+        return _main_base(args)
+    if modo_fila:
+        # Ctrl+C chega também aos trabalhadores, que devolvem suas tarefas à fila
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        return _main_fila(args, consultas, flags)
+
+    # Ctrl+C cancela a consulta atual (downloads abertos são abortados) e encerra
+    cancel = CANCELAMENTO = Cancelamento()
+    signal.signal(signal.SIGINT, lambda *_: cancel.cancelar())
+
+    # Saída .jsonl por site é gravada incrementalmente (sobrevive a quedas e
+    # permite --retomar); os demais formatos passam pelo exportador. Sem
+    # --retomar a saída é sobrescrita (repetir o comando não duplica linhas)
+    sink: Optional[SinkResultados] = None
+    exportador: Optional[Exportador] = None
+    try:
+        if args.saida != "-" and formato_exportacao(args.saida) == "jsonl" and not args.por_contato:
+            sink = SinkResultados(args.saida, anexar=args.retomar)
+        elif args.retomar:
+            print("--retomar precisa de --saida .jsonl (uma linha por site).", file=sys.stderr)
+            return 2
+        else:
+            exportador = abrir_exportador(args.saida, args.por_contato)
+    except (ValueError, RuntimeError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    # Consultas em que o buscador falhou (na varredura: alguma cidade ficou pendente)
+    com_falha = 0
+    try:
+        for consulta in consultas:
+            if cancel.cancelado:
+                break
+            inicio = time.time()
+            if args.varrer_uf:
+                texto = consulta
+                ufs = _ufs_cli(args.varrer_uf)
+                falhas: List[Tuple[str, str]] = []
+                itens = varrer_ufs(consulta, ufs, flags, args.sites, args.local,
+                                   cancel, ao_cidade=_progresso_varredura_cli,
+                                   ao_inicio=_inicio_varredura_cli, recomecar=args.recomecar,
+                                   ao_resultado=_gravador_varredura(sink, consulta, flags,
+                                                                    ",".join(ufs)),
+                                   ao_erro=lambda uf, cidade, e: falhas.append((uf, cidade)))
+                if falhas and not cancel.cancelado:
+                    com_falha += 1
+                    print(f"{texto}: {len(falhas)} cidades com erro ficaram pendentes; "
+                          f"repita o comando para retomá-las", file=sys.stderr)
+            else:
+                texto = montar_consulta(consulta, args.local, args.cidade, args.uf)
+                try:
+                    itens = executar_busca(texto, flags, args.sites, cancel, sink=sink,
+                                           retomar=args.retomar, uf=args.uf, cidade=args.cidade)
+                except FalhaBusca as e:
+                    com_falha += 1
+                    print(e, file=sys.stderr)
+                    continue
+            if exportador is not None:
+                for item in itens:
+                    exportador.escrever({"consulta": texto, **item})
+            print(f"{texto}: {len(itens)} sites em {time.time() - inicio:.1f}s", file=sys.stderr)
+    finally:
+        if sink is not None:
+            sink.fechar()
+        if exportador is not None:
+            exportador.fechar()
+    resumo = resumo_cache_paginas()
+    if resumo:
+        print(resumo, file=sys.stderr)
+    if cancel.cancelado:
+        return 130
+    return 1 if com_falha == len(consultas) else 0
 
-_make_text_readonly(resultado_text)
 
-carregar_estados()
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        sys.exit(main_cli())
+    montar_interface()
+    if MEDIR_INICIO:
+        root.after_idle(_relatar_inicio)
+    root.mainloop()
@@ -1,16 +1,19 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    # Índice de municípios gerado com `python main.py --embutir-municipios` (opcional)
+    datas=[(f, '.') for f in ['municipios.json.gz'] if os.path.exists(f)],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # pyarrow (exportar Parquet) é opcional e pesado: fica fora do executável
+    excludes=['pyarrow'],
     noarchive=False,
     optimize=0,
 )